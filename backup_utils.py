@@ -1,21 +1,36 @@
 """
 Backup manager for DevBackupBuddy.
-Uses MD5-based indexing for smart sync with move detection.
+Uses content-hash indexing for smart sync with move detection.
 """
 import os
 import sys
-from typing import List, Dict, Set
+import time
+import heapq
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, List, Dict, Optional
 from config import EXCLUDE_DIRS, EXCLUDE_EXTENSIONS, MAX_FILE_SIZE_MB
 from file_index import (
-    FileIndex, FileInfo, build_index,
-    load_index_cache, save_index_cache, get_cache_path
+    FileIndex, FileInfo, SkippedFile, build_index, extension_suffixes,
+    load_index_cache, save_index_cache, get_cache_path, cache_sample_matches, to_native_path
 )
 from sync_engine import (
-    generate_sync_plan, execute_sync_plan, verify_mirror,
+    generate_sync_plan, execute_sync_plan, verify_mirror, verify_mirror_from_indexes,
     execute_deletes, cleanup_empty_dirs, print_sync_plan_summary,
-    SyncPlan, SyncResult
+    SyncResult, VERIFY_SAMPLE_FREQ
 )
-from onedrive_utils import is_onedrive_file
+
+STATUS_INTERVAL = 1 / 30  # Refresh the status line at most 30 times per second
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+SKIPPED_SHOWN = 20  # Largest skipped files listed in the summary
+
+
+def _format_size(size_bytes: int) -> str:
+    """Format file size for display, picking the unit from the bit length."""
+    unit = min((max(size_bytes, 1).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    value = size_bytes / (1 << (10 * unit))
+    return f"{value:.0f}{SIZE_UNITS[unit]}" if unit < 2 else f"{value:.1f}{SIZE_UNITS[unit]}"
 
 
 class BackupManager:
@@ -23,34 +38,95 @@ class BackupManager:
     Manages backup operations with smart sync capabilities.
 
     Features:
-    - MD5-based file indexing for detecting moved files
+    - Content-hash file indexing for detecting moved files
     - Cached indexes for faster subsequent backups
     - Safe deletion only after verification
     - Move detection to avoid re-copying reorganized files
     """
 
-    def __init__(self, max_file_size_mb: int = None):
+    def __init__(self, max_file_size_mb: int = None, validation_freq: int = 0,
+                 rebuild_cache: bool = False, fast_hash: bool = False,
+                 paranoid: bool = False, hash_policy: str = "always",
+                 hash_workers: Optional[int] = None, trust_cache: bool = False,
+                 copy_workers: Optional[int] = None):
         self.excluded_dirs = set(EXCLUDE_DIRS)
         self.excluded_extensions = set(EXCLUDE_EXTENSIONS)
+        # Precompiled forms for the per-file exclusion checks
+        self._excl_dirs_frozen = frozenset(self.excluded_dirs)
+        self._excl_ext_tuple = extension_suffixes(self.excluded_extensions)
         self.max_file_size_mb = max_file_size_mb or MAX_FILE_SIZE_MB
-        self.skipped_files: List[Dict] = []
-
-    def _format_size(self, size_bytes: int) -> str:
-        """Format file size for display."""
-        size_mb = size_bytes / (1024 * 1024)
-        if size_mb < 1:
-            return f"{size_bytes / 1024:.0f}KB"
-        if size_mb < 1024:
-            return f"{size_mb:.1f}MB"
-        return f"{size_mb / 1024:.1f}GB"
-
-    def _progress_callback(self, current: int, total: int, filepath: str):
-        """Progress callback for indexing."""
-        pct = (current / total * 100) if total > 0 else 0
+        self.skipped_files: Deque[SkippedFile] = deque()
+        # Re-hash every Nth trusted cache hit (0 = always trust size/mtime/inode match)
+        self.validation_freq = validation_freq
+        # Trusted cache entries later found stale by verification
+        self.invalid_on_use = 0
+        # Re-walk the destination for the index cache instead of updating it in place
+        self.rebuild_cache = rebuild_cache
+        # Let blake3 map and split large files across cores itself
+        self.fast_hash = fast_hash
+        # Re-hash the destination when verifying instead of trusting index digests
+        self.paranoid = paranoid
+        # When to read file contents: always, on_change (size/mtime differ) or never
+        self.hash_policy = hash_policy
+        # Hashing threads per index build (None = file_index.HASH_WORKERS)
+        self.hash_workers = hash_workers
+        # Use the destination index cache as-is (after a spot check) instead of re-walking
+        self.trust_cache = trust_cache
+        # Files copied in parallel (None = sync_engine.COPY_WORKERS)
+        self.copy_workers = copy_workers
+        self._last_print = 0.0
+        self._is_tty = sys.stdout.isatty()
+        self._status_lock = threading.Lock()
+
+    def _throttled_status(self, msg: str, force: bool = False):
+        """
+        Rewrite the status line, at most STATUS_INTERVAL apart unless forced.
+        When stdout is not a TTY (e.g. redirected to a log), lines are printed instead.
+        Thread-safe: concurrent index builds share the one status line.
+        """
+        with self._status_lock:
+            now = time.monotonic()
+            if not force and now - self._last_print < STATUS_INTERVAL:
+                return
+            self._last_print = now
+            if self._is_tty:
+                sys.stdout.write("\r" + msg)
+                sys.stdout.flush()
+            else:
+                print(msg.rstrip())
+
+    def _progress_callback(self, current: int, total: Optional[int], filepath: str,
+                           label: str = ""):
+        """Progress callback for indexing. total is None while it is still unknown."""
         # Truncate filepath for display
         display_path = filepath[:50] + "..." if len(filepath) > 50 else filepath
-        sys.stdout.write(f"\r  Indexing: {pct:5.1f}% ({current}/{total}) {display_path:<55}")
-        sys.stdout.flush()
+        prefix = f"Indexing {label}:" if label else "Indexing:"
+        if total is None:
+            self._throttled_status(f"  {prefix} {current} files {display_path:<55}")
+            return
+        pct = (current / total * 100) if total > 0 else 0
+        self._throttled_status(
+            f"  {prefix} {pct:5.1f}% ({current}/{total}) {display_path:<55}",
+            force=current == total
+        )
+
+    def _build_index_task(self, root: str, max_file_size_mb: int,
+                          cache: Optional[FileIndex] = None, label: str = "",
+                          reference: Optional[FileIndex] = None):
+        """Build the index for one side of the backup (safe to run in a worker thread)."""
+        return build_index(
+            root,
+            excluded_dirs=self._excl_dirs_frozen,
+            excluded_extensions=self._excl_ext_tuple,
+            max_file_size_mb=max_file_size_mb,
+            cache=cache,
+            progress_callback=lambda c, t, f: self._progress_callback(c, t, f, label),
+            validation_freq=self.validation_freq,
+            fast_hash=self.fast_hash,
+            hash_policy=self.hash_policy,
+            reference=reference,
+            hash_workers=self.hash_workers
+        )
 
     def _sync_progress_callback(self, action: str, item, current: int, total: int):
         """Progress callback for sync operations."""
@@ -58,15 +134,19 @@ class BackupManager:
         display_path = item.src_rel_path or item.dst_rel_path
         if len(display_path) > 45:
             display_path = display_path[:45] + "..."
-        sys.stdout.write(f"\r  {action.upper():6} {pct:5.1f}% ({current}/{total}) {display_path:<50}")
-        sys.stdout.flush()
+        self._throttled_status(
+            f"  {action.upper():6} {pct:5.1f}% ({current}/{total}) {display_path:<50}",
+            force=current == total
+        )
 
     def _verify_progress_callback(self, current: int, total: int, filepath: str):
         """Progress callback for verification."""
         pct = (current / total * 100) if total > 0 else 0
         display_path = filepath[:50] + "..." if len(filepath) > 50 else filepath
-        sys.stdout.write(f"\r  Verifying: {pct:5.1f}% ({current}/{total}) {display_path:<50}")
-        sys.stdout.flush()
+        self._throttled_status(
+            f"  Verifying: {pct:5.1f}% ({current}/{total}) {display_path:<50}",
+            force=current == total
+        )
 
     def backup_directory(self, src: str, dst: str, dry_run: bool = False, verify_only: bool = False):
         """
@@ -98,45 +178,70 @@ class BackupManager:
         print(f"Excluded dirs: {', '.join(sorted(self.excluded_dirs))}")
         print(f"{'-' * 70}")
 
-        # Phase 1: Build source index
-        print("\n[Phase 1] Building source index...")
-        src_index, src_skipped = build_index(
-            src,
-            excluded_dirs=self.excluded_dirs,
-            excluded_extensions=self.excluded_extensions,
-            max_file_size_mb=self.max_file_size_mb,
-            progress_callback=self._progress_callback
-        )
-        print(f"\n  Source: {len(src_index)} files indexed, {len(src_skipped)} skipped")
-        self.skipped_files = src_skipped
+        cache_path = get_cache_path(dst)
+
+        dst_cache = load_index_cache(cache_path)  # None if missing or invalid
+
+        # If verify_only, index the source, verify and exit. Without a destination
+        # cache, destination files whose size and mtime match the source are trusted,
+        # except a sample (every --validation-freq'th file, default 1 in
+        # VERIFY_SAMPLE_FREQ) which is re-hashed; in paranoid mode every file is.
+        if verify_only and (self.paranoid or not dst_cache):
+            print("\n[Phase 1] Building source index...")
+            src_index, src_skipped = self._build_index_task(
+                src, self.max_file_size_mb, reference=dst_cache
+            )
+            print(f"\n  Source: {len(src_index)} files indexed, {len(src_skipped)} skipped")
+            self.skipped_files = src_skipped
 
-        # If verify_only, just verify and exit
-        if verify_only:
             print("\n[Verify Only Mode] Checking destination...")
             success, mismatches = verify_mirror(
                 src_index, dst,
-                progress_callback=self._verify_progress_callback
+                progress_callback=self._verify_progress_callback,
+                hash_workers=self.hash_workers,
+                trust_mtime=not self.paranoid,
+                validation_freq=self.validation_freq or VERIFY_SAMPLE_FREQ
             )
             print()
             self._print_verification_result(success, mismatches)
             return
 
-        # Phase 2: Build destination index (with cache)
-        print("\n[Phase 2] Building destination index...")
-        cache_path = get_cache_path(dst)
-        dst_cache = load_index_cache(cache_path) if os.path.exists(cache_path) else None
+        # Phases 1 + 2: Build source and destination (with cache) indexes concurrently.
+        # They are usually on different disks and both mostly wait on I/O.
+        print("\n[Phase 1+2] Building source and destination indexes...")
         if dst_cache:
-            print(f"  Using cached index ({len(dst_cache)} entries)")
-
-        dst_index, _ = build_index(
-            dst,
-            excluded_dirs=self.excluded_dirs,
-            excluded_extensions=self.excluded_extensions,
-            max_file_size_mb=999999,  # Don't skip large files in destination
-            cache=dst_cache,
-            progress_callback=self._progress_callback
-        )
-        print(f"\n  Destination: {len(dst_index)} files indexed")
+            print(f"  Using cached destination index ({len(dst_cache)} entries)")
+
+        trusted = False
+        if self.trust_cache and dst_cache and not verify_only:
+            trusted = cache_sample_matches(dst, dst_cache)
+            if not trusted:
+                print("  Cache spot check failed - re-walking the destination")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            src_future = executor.submit(
+                self._build_index_task, src, self.max_file_size_mb, None, "src", dst_cache
+            )
+            if trusted:
+                dst_index = dst_cache
+                dst_index.from_cache.update(dst_index.path_to_idx)
+            else:
+                dst_future = executor.submit(
+                    # Don't skip large files in destination
+                    self._build_index_task, dst, 999999, dst_cache, "dst"
+                )
+                dst_index, _ = dst_future.result()
+            src_index, src_skipped = src_future.result()
+
+        print(f"\n  Source: {len(src_index)} files indexed, {len(src_skipped)} skipped")
+        print(f"  Destination: {len(dst_index)} files indexed")
+        self.skipped_files = src_skipped
+
+        if verify_only:
+            print("\n[Verify Only Mode] Comparing source and cached destination digests...")
+            success, mismatches = verify_mirror_from_indexes(src_index, dst_index)
+            self._print_verification_result(success, mismatches)
+            return
 
         # Phase 3: Generate sync plan
         print("\n[Phase 3] Generating sync plan...")
@@ -162,7 +267,8 @@ class BackupManager:
         result = execute_sync_plan(
             plan,
             dry_run=dry_run,
-            progress_callback=self._sync_progress_callback
+            progress_callback=self._sync_progress_callback,
+            copy_workers=self.copy_workers
         )
         print()
 
@@ -173,20 +279,31 @@ class BackupManager:
             if len(result.errors) > 10:
                 print(f"    ... and {len(result.errors) - 10} more errors")
 
+        # Bring the destination index up to date with the moves and copies
+        self._apply_transfers_to_index(dst_index, src_index, result, dst)
+
         # Phase 5: Verify mirror integrity
         print("\n[Phase 5] Verifying mirror integrity...")
-        success, mismatches = verify_mirror(
-            src_index, dst,
-            progress_callback=self._verify_progress_callback
-        )
-        print()
+        if self.paranoid:
+            success, mismatches = verify_mirror(
+                src_index, dst,
+                progress_callback=self._verify_progress_callback,
+                hash_workers=self.hash_workers
+            )
+            print()
+        else:
+            success, mismatches = verify_mirror_from_indexes(src_index, dst_index)
 
         if not success:
+            stale = sum(1 for m in mismatches if m["path"] in dst_index.from_cache)
+            self.invalid_on_use += stale
             print(f"\n  VERIFICATION FAILED - {len(mismatches)} mismatches found:")
             for m in mismatches[:10]:
                 print(f"    {m['path']}: {m['reason']}")
             if len(mismatches) > 10:
                 print(f"    ... and {len(mismatches) - 10} more")
+            if stale:
+                print(f"  {stale} of these were trusted from a stale index cache.")
             print("\n  Skipping deletions due to verification failure.")
             self._print_summary(result.copied, result.moved, 0, result.skipped)
             return
@@ -197,7 +314,7 @@ class BackupManager:
         deleted = 0
         if plan.deletes:
             print(f"\n[Phase 6] Deleting {len(plan.deletes)} orphaned files...")
-            deleted, del_errors = execute_deletes(plan, dry_run=dry_run)
+            deleted, del_errors = execute_deletes(plan, dry_run=dry_run, result=result)
             if del_errors:
                 print(f"  Errors during deletion:")
                 for err in del_errors[:5]:
@@ -211,21 +328,72 @@ class BackupManager:
 
         # Phase 8: Save updated index cache
         print("\n[Phase 8] Saving index cache...")
-        # Rebuild destination index after all changes
-        final_dst_index, _ = build_index(
-            dst,
-            excluded_dirs=self.excluded_dirs,
-            excluded_extensions=self.excluded_extensions,
-            max_file_size_mb=999999,
-            progress_callback=None  # Silent rebuild
-        )
-        save_index_cache(cache_path, final_dst_index)
-        print(f"  Cache saved: {cache_path}")
+        if self.rebuild_cache:
+            # Rebuild destination index after all changes, reusing digests of unchanged files
+            final_dst_index, _ = build_index(
+                dst,
+                excluded_dirs=self._excl_dirs_frozen,
+                excluded_extensions=self._excl_ext_tuple,
+                max_file_size_mb=999999,
+                cache=dst_index,
+                progress_callback=None,  # Silent rebuild
+                fast_hash=self.fast_hash,
+                hash_policy=self.hash_policy,
+                hash_workers=self.hash_workers
+            )
+        else:
+            for rel_path in result.deleted_paths:
+                dst_index.remove(rel_path)
+            final_dst_index = dst_index
+        try:
+            save_index_cache(cache_path, final_dst_index)
+            print(f"  Cache saved: {cache_path}")
+        except (OSError, ValueError, TypeError) as e:
+            # The sync itself is complete; the next run just re-hashes the destination
+            print(f"  Warning: could not save index cache: {e}")
 
         # Print final summary
         self._print_summary(result.copied, result.moved, deleted, result.skipped)
         self._print_skipped_files()
 
+    def _apply_transfers_to_index(self, dst_index: FileIndex, src_index: FileIndex,
+                                  result: SyncResult, dst: str) -> FileIndex:
+        """
+        Update the destination index in place from the moves and copies of the sync
+        result, instead of re-walking the destination. Copied files inherit their
+        digest from the source.
+        """
+        for old_rel, new_rel in result.moved_paths:
+            moved = dst_index.remove(old_rel)
+            if moved:
+                dst_index.remove(new_rel)
+                dst_index.add(FileInfo(
+                    relative_path=new_rel,
+                    digest=moved.digest,
+                    mtime=moved.mtime,
+                    size=moved.size,
+                    mtime_ns=moved.mtime_ns,
+                    ino=moved.ino
+                ))
+
+        for rel_path in result.copied_paths:
+            dst_index.remove(rel_path)
+            src_file = src_index.get_by_path(rel_path)
+            try:
+                stat = os.stat(os.path.join(dst, to_native_path(rel_path)))
+            except OSError:
+                continue
+            dst_index.add(FileInfo(
+                relative_path=rel_path,
+                digest=src_file.digest,
+                mtime=stat.st_mtime,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                ino=stat.st_ino
+            ))
+
+        return dst_index
+
     def _print_verification_result(self, success: bool, mismatches: List[Dict]):
         """Print verification results."""
         print(f"\n{'=' * 70}")
@@ -259,12 +427,13 @@ class BackupManager:
         print(f"{'File':<50} | {'Size':<10} | Reason")
         print("-" * 90)
 
-        # Sort by size descending
-        sorted_skipped = sorted(self.skipped_files, key=lambda x: x["size_mb"], reverse=True)
-        for item in sorted_skipped[:20]:
-            filename = item['filename'][:48]
-            size = self._format_size(int(item['size_mb'] * 1024 * 1024))
-            print(f"{filename:<50} | {size:<10} | {item['reason']}")
+        # Largest first - only the top few are shown, so no full sort. SkippedFile
+        # tuples lead with size_mb, so they compare by size without a key function.
+        largest = heapq.nlargest(SKIPPED_SHOWN, self.skipped_files)
+        for item in largest:
+            filename = item.filename[:48]
+            size = _format_size(int(item.size_mb * 1024 * 1024))
+            print(f"{filename:<50} | {size:<10} | {item.reason}")
 
-        if len(sorted_skipped) > 20:
-            print(f"... and {len(sorted_skipped) - 20} more skipped files")
+        if len(self.skipped_files) > SKIPPED_SHOWN:
+            print(f"... and {len(self.skipped_files) - SKIPPED_SHOWN} more skipped files")
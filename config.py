@@ -1,6 +1,11 @@
 """
 Configuration settings for the backup script.
+
+The values below are the defaults. Settings changed with `python main.py config`
+are saved to ~/.devbackupbuddy/config.json and override them at import.
 """
+import json
+import os
 
 # Maximum file size in MB (files larger than this will be skipped)
 MAX_FILE_SIZE_MB = 256
@@ -170,4 +175,71 @@ PROJECT_TEMPLATES = {
             'CHANGELOG.md',
         ],
     },
-}
\ No newline at end of file
+}
+
+
+# User overrides (written by `python main.py config`)
+USER_CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".devbackupbuddy", "config.json")
+USER_SETTINGS = ("MAX_FILE_SIZE_MB", "EXCLUDE_DIRS", "EXCLUDE_EXTENSIONS")
+
+
+def _is_positive_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _is_str_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+# What each saved setting must look like to be applied
+_USER_SETTING_CHECKS = {
+    "MAX_FILE_SIZE_MB": (_is_positive_int, "a positive integer"),
+    "EXCLUDE_DIRS": (_is_str_list, "a list of strings"),
+    "EXCLUDE_EXTENSIONS": (_is_str_list, "a list of strings"),
+}
+
+
+def _load_user_config():
+    """
+    Apply saved user overrides on top of the defaults above.
+    Overrides of the wrong type (e.g. a hand-edited file) are ignored with a warning.
+    """
+    try:
+        with open(USER_CONFIG_PATH, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(overrides, dict):
+        print(f"Warning: ignoring {USER_CONFIG_PATH}: expected a JSON object")
+        return
+    for name in USER_SETTINGS:
+        if name not in overrides:
+            continue
+        is_valid, expected = _USER_SETTING_CHECKS[name]
+        if is_valid(overrides[name]):
+            globals()[name] = overrides[name]
+        else:
+            print(f"Warning: ignoring {name} in {USER_CONFIG_PATH}: expected {expected}")
+
+
+def save_user_config():
+    """Save the current user settings as one JSON document (written atomically)."""
+    os.makedirs(os.path.dirname(USER_CONFIG_PATH), exist_ok=True)
+    temp_path = USER_CONFIG_PATH + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            # Serialized in one go: json.dump would issue a write() per encoded fragment
+            f.write(json.dumps({name: globals()[name] for name in USER_SETTINGS}, indent=2))
+        os.replace(temp_path, USER_CONFIG_PATH)
+    finally:
+        # Never leave a partial settings file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+_load_user_config()
+
+# Lookup forms of the exclusion lists: directory names compared via os.path.normcase
+# (case-insensitive on Windows), extensions lowercased
+EXCLUDE_DIRS_SET = frozenset(os.path.normcase(d) for d in EXCLUDE_DIRS)
+EXCLUDE_EXT_SET = frozenset(e.lower() for e in EXCLUDE_EXTENSIONS)
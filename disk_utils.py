@@ -2,12 +2,23 @@
 Disk utilities for detecting available drives and managing file operations.
 """
 import os
+import sys
 import string
 from typing import List
 
+def _logical_drive_letters() -> List[str]:
+    """Drive letters present, from one GetLogicalDrives() bitmask on Windows."""
+    if sys.platform == "win32":
+        import ctypes
+        mask = ctypes.windll.kernel32.GetLogicalDrives()
+        if mask:
+            return [d for i, d in enumerate(string.ascii_uppercase) if mask & (1 << i)]
+    # Fallback: probe each letter
+    return [d for d in string.ascii_uppercase if os.path.exists(f"{d}:")]
+
 def get_available_drives() -> List[str]:
-    system_drive = os.environ.get("SystemDrive", "C:")
-    drives = [f"{d}:\\" for d in string.ascii_uppercase if os.path.exists(f"{d}:") and f"{d}:\\" != system_drive]
+    system_drive = os.environ.get("SystemDrive", "C:").rstrip("\\").upper() + "\\"
+    drives = [f"{d}:\\" for d in _logical_drive_letters() if f"{d}:\\" != system_drive]
     return drives
 
 def is_valid_destination(destination: str) -> bool:
@@ -1,108 +1,429 @@
 """
 File indexing module for DevBackupBuddy.
-Provides MD5-based file fingerprinting, indexing, and cache persistence.
+Provides content-hash file fingerprinting, indexing, and cache persistence.
+
+Hashing uses BLAKE3 when the `blake3` package is installed (pip install blake3)
+and falls back to BLAKE2b otherwise. Digests are stored namespaced ("blake3:<hex>"),
+so cached entries produced by a different algorithm are detected and re-hashed.
+The index cache is read and written with `orjson` when installed, else with json.
 """
 import os
+import re
+import sys
 import json
+import random
+import mmap
 import hashlib
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Set
+from array import array
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from collections import deque
+from typing import Deque, Dict, FrozenSet, List, NamedTuple, Optional, Pattern, Set, Tuple
 from datetime import datetime
-from pathlib import Path
-from config import EXCLUDE_DIRS, EXCLUDE_EXTENSIONS, MAX_FILE_SIZE_MB
+from config import EXCLUDE_DIRS_SET, EXCLUDE_EXT_SET, MAX_FILE_SIZE_MB
+from onedrive_utils import IS_WINDOWS, hydration_slots, is_online_only_stat
 
-INDEX_CACHE_FILENAME = ".backup_index.json"
-INDEX_VERSION = 1
-HASH_CHUNK_SIZE = 8192  # 8KB chunks for MD5 computation
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+INDEX_CACHE_FILENAME = ".backup_index.json"
+INDEX_VERSION = 4
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB chunks amortize the per-read Python overhead
+HASH_ALGORITHM = "blake3" if blake3 is not None else "blake2b"
+MMAP_MIN_SIZE = 16 * 1024 * 1024       # Memory-map files of 16MB and up for hashing
+BLAKE3_THREADED_MIN_SIZE = 128 * 1024  # Multi-threaded BLAKE3 only pays off above ~128KB
+FAST_HASH_MIN_SIZE = 8 * 1024 * 1024   # --fast-hash: let blake3 map and split files above 8MB
+DIGEST_PREFIX = HASH_ALGORITHM + ":"
+HASH_POLICIES = ("always", "on_change", "never")
+STAT_FINGERPRINT_PREFIX = "stat:"  # Digests recorded under hash_policy="never"
+# Mtimes compared across trees count as equal this close together, like rsync's
+# --modify-window: FAT32 keeps 2s timestamps and exFAT 10ms
+MODIFY_WINDOW_NS = 2 * 1_000_000_000
+CACHE_SAMPLE_SIZE = 32  # Entries stat'ed to validate a trusted index cache
+HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # Hashing releases the GIL, so threads overlap I/O
+SERIAL_HASH_MIN_SIZE = 512 * 1024 * 1024  # Files this large are hashed one at a time
+STAT_WORKERS = 16      # Concurrent stat() calls while walking (POSIX only)
+STAT_BATCH_SIZE = 256  # Directory entries stat'ed per batch
+
+# Whole-file reads: O_SEQUENTIAL (Windows) opens with FILE_FLAG_SEQUENTIAL_SCAN, so the
+# cache manager - and OneDrive, for placeholders - read ahead aggressively
+SEQUENTIAL_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_SEQUENTIAL", 0)
+STAT_CHUNK_SIZE = 16   # Entries per stat task, to amortize the dispatch overhead
+
+
+# __slots__ dataclasses need Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class FileInfo:
-    """Information about a single file."""
+    """Information about a single file (immutable; the index stores its fields in arrays)."""
     relative_path: str   # Path relative to root (normalized with forward slashes)
-    md5: str             # MD5 hash of file contents
+    digest: str          # Namespaced content digest, e.g. "blake3:<hex>"
     mtime: float         # Last modified timestamp
     size: int            # File size in bytes
+    mtime_ns: int = 0    # Last modified timestamp in nanoseconds (cache key)
+    ino: int = 0         # Inode / file index (cache key, 0 if unknown)
+
+
+class SkippedFile(NamedTuple):
+    """A file left out of the index, with the reason."""
+    size_mb: float
+    filename: str
+    reason: str
+    path: str
 
 
 class FileIndex:
     """
-    Index of files with lookups by path and by MD5.
-    Enables efficient detection of moved files via content hash matching.
+    Index of files with lookups by path.
+
+    Stored as parallel arrays (struct-of-arrays) indexed by a per-file slot, so a
+    large index costs a few machine words per file instead of an object per file.
+    FileInfo objects are built on demand by the accessors.
     """
     def __init__(self):
-        self.by_path: Dict[str, FileInfo] = {}       # relative_path -> FileInfo
-        self.by_md5: Dict[str, List[FileInfo]] = {}  # md5 -> list of FileInfo
+        self.paths: List[Optional[str]] = []      # slot -> relative_path (None once removed)
+        self.digests: List[str] = []              # slot -> namespaced content digest
+        self.sizes = array("q")                   # slot -> size in bytes
+        self.mtimes = array("d")                  # slot -> mtime
+        self.mtimes_ns = array("q")               # slot -> mtime in nanoseconds
+        self.inos = array("Q")                    # slot -> inode / file index
+        self.path_to_idx: Dict[str, int] = {}     # relative_path -> slot
+        self.from_cache: Set[str] = set()         # paths whose digest was trusted from cache
 
     def add(self, file_info: FileInfo):
-        """Add a file to the index."""
-        self.by_path[file_info.relative_path] = file_info
-        if file_info.md5 not in self.by_md5:
-            self.by_md5[file_info.md5] = []
-        self.by_md5[file_info.md5].append(file_info)
+        """Add a file to the index (replacing any entry at the same path)."""
+        self.add_entry(file_info.relative_path, file_info.digest, file_info.mtime,
+                       file_info.size, file_info.mtime_ns, file_info.ino)
+
+    def add_entry(self, relative_path: str, digest: str, mtime: float, size: int,
+                  mtime_ns: int = 0, ino: int = 0):
+        """Add a file from its fields, without building a FileInfo."""
+        if relative_path in self.path_to_idx:
+            self.remove(relative_path)
+
+        idx = len(self.paths)
+        self.paths.append(relative_path)
+        self.digests.append(digest)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.mtimes_ns.append(mtime_ns)
+        self.inos.append(ino)
+        self.path_to_idx[relative_path] = idx
+
+    def remove(self, relative_path: str) -> Optional[FileInfo]:
+        """Remove a file from the index. Returns the removed FileInfo, if any."""
+        idx = self.path_to_idx.pop(relative_path, None)
+        if idx is None:
+            return None
+        file_info = self.info(idx)
+        self.paths[idx] = None
+        self.from_cache.discard(relative_path)
+        return file_info
+
+    def info(self, idx: int) -> FileInfo:
+        """Build the FileInfo for a slot."""
+        return FileInfo(
+            relative_path=self.paths[idx],
+            digest=self.digests[idx],
+            mtime=self.mtimes[idx],
+            size=self.sizes[idx],
+            mtime_ns=self.mtimes_ns[idx],
+            ino=self.inos[idx]
+        )
 
     def get_by_path(self, relative_path: str) -> Optional[FileInfo]:
         """Get file info by relative path."""
-        return self.by_path.get(relative_path)
-
-    def get_by_md5(self, md5: str) -> List[FileInfo]:
-        """Get all files with a given MD5 hash."""
-        return self.by_md5.get(md5, [])
+        idx = self.path_to_idx.get(relative_path)
+        return None if idx is None else self.info(idx)
 
     def all_files(self) -> List[FileInfo]:
         """Get all files in the index."""
-        return list(self.by_path.values())
+        return [self.info(idx) for idx in self.path_to_idx.values()]
+
+    def __contains__(self, relative_path: str) -> bool:
+        return relative_path in self.path_to_idx
 
     def __len__(self) -> int:
-        return len(self.by_path)
+        return len(self.path_to_idx)
 
 
-def compute_md5(filepath: str) -> str:
-    """Compute MD5 hash of a file using chunked reading."""
-    hash_md5 = hashlib.md5()
-    with open(filepath, "rb") as f:
+def _new_hasher(size: int):
+    """Create a hasher for a file of the given size."""
+    if blake3 is None:
+        return hashlib.blake2b()
+    if size > BLAKE3_THREADED_MIN_SIZE:
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return blake3.blake3()
+
+
+def _hash_chunked(filepath: str, hasher):
+    """Feed a file to the hasher using chunked reading."""
+    with open(os.open(filepath, SEQUENTIAL_READ_FLAGS), "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
         for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+            hasher.update(chunk)
+
+
+def _hash_mmap(filepath: str, hasher) -> bool:
+    """
+    Feed a file to the hasher through a read-only memory map (no per-chunk copies).
+    Returns False if the file could not be mapped, so the caller can fall back.
+    """
+    fd = os.open(filepath, SEQUENTIAL_READ_FLAGS)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty (truncated since stat) or unmappable file
+            return False
+        with mm:
+            hasher.update(mm)
+        return True
+    finally:
+        os.close(fd)
+
+
+def compute_hash(filepath: str, size: Optional[int] = None, fast_hash: bool = False,
+                 online_only: bool = False) -> str:
+    """
+    Compute the namespaced content digest of a file.
+    Returns "blake3:<hex>", or "blake2b:<hex>" when blake3 is not installed.
+
+    With fast_hash, files above FAST_HASH_MIN_SIZE are mapped by blake3 itself
+    (update_mmap), which splits the tree hash across all cores. The digest is the same.
+    online_only says whether the file is a cloud placeholder (is_online_only_stat()),
+    so reading it is throttled to DBB_ONEDRIVE_MAXPARALLEL downloads.
+    """
+    if size is None:
+        size = os.path.getsize(filepath)
+    hasher = _new_hasher(size)
+
+    # Empty files can't be mapped, small files hash faster with plain reads,
+    # and OneDrive placeholders are hydrated on read
+    if size > 0:
+        if online_only:
+            # Reading downloads the file; the hashing pool is larger than OneDrive
+            # handles well, so only DBB_ONEDRIVE_MAXPARALLEL downloads run at once
+            with hydration_slots:
+                _hash_chunked(filepath, hasher)
+        elif fast_hash and blake3 is not None and size > FAST_HASH_MIN_SIZE:
+            hasher.update_mmap(filepath)
+        elif size < MMAP_MIN_SIZE or not _hash_mmap(filepath, hasher):
+            _hash_chunked(filepath, hasher)
+
+    return f"{HASH_ALGORITHM}:{hasher.hexdigest()}"
+
+
+def is_current_digest(digest: Optional[str]) -> bool:
+    """Check if a (cached) digest was produced by the active hash algorithm."""
+    return bool(digest) and digest.startswith(DIGEST_PREFIX)
 
 
-def normalize_path(path: str) -> str:
-    """Normalize path to use forward slashes for consistency."""
-    return path.replace("\\", "/")
+def stat_fingerprint(rel_path: str, stat: os.stat_result) -> str:
+    """
+    Stand-in digest for hash_policy="never", tied to the path so unrelated files
+    with equal metadata are never mistaken for moves. Entries carrying one are
+    compared by size and mtime (see mtimes_match), never by this string, and are
+    not saved to the index cache.
+    """
+    return f"{STAT_FINGERPRINT_PREFIX}{stat.st_size}:{stat.st_mtime_ns}:{rel_path}"
+
+
+def mtimes_match(mtime_ns: int, other_mtime_ns: int) -> bool:
+    """Check if two files' mtimes are equal to within MODIFY_WINDOW_NS."""
+    return abs(mtime_ns - other_mtime_ns) <= MODIFY_WINDOW_NS
+
+
+if os.sep == "/":
+    def to_native_path(rel_path: str) -> str:
+        """Index paths already use the native separator here (no copy made)"""
+        return rel_path
+else:
+    def to_native_path(rel_path: str) -> str:
+        """Convert an index path (forward slashes) to native separators"""
+        return rel_path.replace("/", os.sep)
+
+
+def extension_suffixes(excluded_extensions) -> tuple:
+    """Lowercase tuple of extensions, for a single C-level str.endswith() check."""
+    return tuple(ext.lower() for ext in excluded_extensions)
+
+
+def _dir_name_regex(name: str) -> str:
+    """Regex source for one excluded directory name; `*` and `?` wildcards stay within a component."""
+    return re.escape(name).replace(r"\*", r"[^\\/]*").replace(r"\?", r"[^\\/]")
+
+
+def is_dir_glob(name: str) -> bool:
+    """Check if an excluded directory entry is a wildcard pattern rather than a literal name."""
+    return "*" in name or "?" in name
 
 
-def should_exclude(
-    path: str,
-    excluded_dirs: Set[str],
-    excluded_extensions: Set[str],
-    max_file_size_mb: int
-) -> Optional[str]:
+def split_dir_excludes(excluded_dirs) -> Tuple[FrozenSet[str], Optional[Pattern]]:
     """
-    Check if a file/directory should be excluded.
-    Returns the reason string if excluded, None if not excluded.
+    Split excluded directory entries for the walker: literal names go into a
+    frozenset (one hash lookup per directory), wildcard patterns are compiled
+    into a single alternation matched against the whole name, or None if there
+    are no patterns. Names are os.path.normcase'd, so both are case-insensitive
+    on Windows.
     """
-    parts = Path(path).parts
+    names = {os.path.normcase(d) for d in excluded_dirs}
+    globs = sorted(d for d in names if is_dir_glob(d))
+    if not globs:
+        return frozenset(names), None
+    pattern = re.compile("|".join(_dir_name_regex(g) for g in globs))
+    return frozenset(names.difference(globs)), pattern
 
-    # Check excluded directories
-    for part in parts:
-        if part in excluded_dirs:
-            return f"Excluded directory: {part}"
 
-    # Check excluded extensions
-    for ext in excluded_extensions:
-        if path.lower().endswith(ext.lower()):
+def make_file_filter(excluded_extensions, max_file_size_mb: int):
+    """
+    Build the per-file exclusion check for a fixed configuration.
+
+    Returns check(name, size) -> reason or None, with the extension suffixes and the
+    size limit (in bytes) bound as closure constants. Excluded directories are not
+    checked here: the walk prunes them (see split_dir_excludes()), and each file's
+    size comes from its DirEntry.
+    """
+    suffixes = extension_suffixes(excluded_extensions)
+    max_bytes = max_file_size_mb * 1024 * 1024
+
+    def check(name: str, size: int) -> Optional[str]:
+        name_lower = name.lower()
+        if name_lower.endswith(suffixes):
+            ext = next(e for e in suffixes if name_lower.endswith(e))
             return f"Excluded extension: {ext}"
+        if size > max_bytes:
+            return f"File size {size / (1024 * 1024):.1f}MB > {max_file_size_mb}MB"
+        return None
+
+    return check
 
-    # Check file size (only for files)
-    if os.path.isfile(path):
+
+def _iter_tree(root: str, excluded_dirs: FrozenSet[str], rel_prefix: str = "",
+               excluded_dir_pattern: Optional[Pattern] = None):
+    """
+    Yield (DirEntry, rel_path) for every file under root, pruning excluded directories.
+    Uses os.scandir so file type (and on Windows, stat) comes from the directory read,
+    and an explicit stack instead of recursion so deep trees don't nest generators.
+    excluded_dirs and excluded_dir_pattern come from split_dir_excludes().
+    """
+    normcase = os.path.normcase
+    glob_match = excluded_dir_pattern.fullmatch if excluded_dir_pattern is not None else None
+    stack = [(root, rel_prefix)]
+    while stack:
+        dirpath, prefix = stack.pop()
+        subdirs = []
         try:
-            size_mb = os.path.getsize(path) / (1024 * 1024)
-            if size_mb > max_file_size_mb:
-                return f"File size {size_mb:.1f}MB > {max_file_size_mb}MB"
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    rel_path = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        # Prune excluded directories before they are ever opened
+                        dir_name = normcase(entry.name)
+                        if dir_name not in excluded_dirs and not (glob_match and glob_match(dir_name)):
+                            subdirs.append((entry.path, rel_path + "/"))
+                    elif not entry.is_dir():
+                        # Symlinks to directories are not followed (same as os.walk)
+                        yield entry, rel_path
         except OSError:
-            pass
+            continue
+        # Reversed so directories are visited in scandir order
+        stack.extend(reversed(subdirs))
+
 
-    return None
+def _stat_chunk(entries: List[os.DirEntry]) -> List:
+    """stat() a chunk of entries, returning the OSError in place of a failed stat."""
+    results = []
+    for entry in entries:
+        try:
+            results.append(entry.stat())
+        except OSError as e:
+            results.append(e)
+    return results
+
+
+def _iter_stats(tree, stat_executor: Optional[ThreadPoolExecutor]):
+    """
+    Yield (DirEntry, rel_path, stat_result or OSError) for the entries from _iter_tree.
+
+    On Windows the stat comes free with the directory read. Elsewhere each stat is
+    a syscall, so batches are stat'ed concurrently by stat_executor - keeping many
+    requests in flight hides the latency of cold disks and network shares.
+    """
+    if stat_executor is None:
+        for entry, rel_path in tree:
+            try:
+                yield entry, rel_path, entry.stat()
+            except OSError as e:
+                yield entry, rel_path, e
+        return
+
+    while True:
+        batch = list(islice(tree, STAT_BATCH_SIZE))
+        if not batch:
+            return
+        entries = [entry for entry, _ in batch]
+        chunks = [entries[i:i + STAT_CHUNK_SIZE] for i in range(0, len(entries), STAT_CHUNK_SIZE)]
+        stats = [stat for chunk in stat_executor.map(_stat_chunk, chunks) for stat in chunk]
+        for (entry, rel_path), stat in zip(batch, stats):
+            yield entry, rel_path, stat
+
+
+def _add_skipped(skipped: Deque[SkippedFile], path: str, filename: str, reason: str,
+                 size_bytes: Optional[int] = None):
+    """Record a skipped file. Only stats the file if the caller doesn't know its size."""
+    if size_bytes is None:
+        try:
+            size_bytes = os.path.getsize(path)
+        except OSError:
+            size_bytes = 0
+    skipped.append(SkippedFile(size_bytes / (1024 * 1024), filename, reason, path))
+
+
+def _hash_one(filepath: str, rel_path: str, stat: os.stat_result,
+              fast_hash: bool = False) -> FileInfo:
+    """Hash a single file (runs in the worker pool)."""
+    return FileInfo(
+        relative_path=rel_path,
+        digest=compute_hash(filepath, stat.st_size, fast_hash, is_online_only_stat(stat)),
+        mtime=stat.st_mtime,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        ino=stat.st_ino
+    )
+
+
+def _cache_entry_matches(cache: FileIndex, idx: int, stat: os.stat_result,
+                         other_tree: bool = False) -> bool:
+    """
+    Check if the cache entry in slot idx still describes the file on disk.
+    Matches on (size, mtime_ns, inode); an inode of 0 means unknown and is ignored.
+    other_tree=True is for entries describing the same path in another tree: the
+    inode is not compared and mtimes only need to match to within MODIFY_WINDOW_NS,
+    as the other tree may be on a filesystem with coarser timestamps.
+    """
+    if other_tree:
+        return (cache.sizes[idx] == stat.st_size and
+                mtimes_match(cache.mtimes_ns[idx], stat.st_mtime_ns) and
+                is_current_digest(cache.digests[idx]))
+    cached_ino = cache.inos[idx]
+    return (cache.sizes[idx] == stat.st_size and
+            cache.mtimes_ns[idx] == stat.st_mtime_ns and
+            (not cached_ino or not stat.st_ino or cached_ino == stat.st_ino) and
+            is_current_digest(cache.digests[idx]))
 
 
 def build_index(
@@ -110,151 +431,251 @@ def build_index(
     excluded_dirs: Set[str] = None,
     excluded_extensions: Set[str] = None,
     max_file_size_mb: int = None,
-    cache: Optional[Dict] = None,
-    progress_callback=None
-) -> tuple[FileIndex, List[Dict]]:
+    cache: Optional[FileIndex] = None,
+    progress_callback=None,
+    validation_freq: int = 0,
+    fast_hash: bool = False,
+    hash_policy: str = "always",
+    reference: Optional[FileIndex] = None,
+    hash_workers: Optional[int] = None
+) -> tuple[FileIndex, Deque[SkippedFile]]:
     """
     Build a FileIndex for all files under root.
 
     Args:
         root: Root directory to index
-        excluded_dirs: Set of directory names to exclude
-        excluded_extensions: Set of file extensions to exclude
+        excluded_dirs: Set of directory names to exclude (`*` and `?` wildcards allowed)
+        excluded_extensions: File extensions to exclude (case-insensitive)
         max_file_size_mb: Maximum file size in MB
-        cache: Optional cached index data from previous run
-        progress_callback: Optional callback(current, total, filepath) for progress
+        cache: Optional index loaded from the previous run's cache
+        progress_callback: Optional callback(current, total, filepath) for progress.
+            total is an estimate (the cache size) or None until the walk has finished
+        validation_freq: Re-hash every Nth cache hit to catch stale entries (0 = trust all hits)
+        fast_hash: Hash large files with blake3's own multi-threaded mmap reader
+        hash_policy: "always" hashes every file not in cache; "on_change" also reuses
+            the digest from reference (the other tree's cache) when the file at the
+            same path has the same size and mtime (to within MODIFY_WINDOW_NS); "never"
+            records stat_fingerprint() instead of reading any file (disables move
+            detection), keeping digests from cache where it still matches
+        reference: Cached index of the other side of the backup, for "on_change"
+        hash_workers: Threads hashing files concurrently (default HASH_WORKERS). Files of
+            SERIAL_HASH_MIN_SIZE and up go to one extra thread, so their long sequential
+            reads don't compete with each other
 
     Returns:
-        Tuple of (FileIndex, list of skipped files with reasons)
+        Tuple of (FileIndex, deque of SkippedFile records)
     """
-    excluded_dirs = excluded_dirs or set(EXCLUDE_DIRS)
-    excluded_extensions = excluded_extensions or set(EXCLUDE_EXTENSIONS)
+    if hash_policy not in HASH_POLICIES:
+        raise ValueError(f"Unknown hash policy: {hash_policy}")
+    excluded_dirs, excluded_dir_pattern = split_dir_excludes(excluded_dirs or EXCLUDE_DIRS_SET)
+    excluded_extensions = extension_suffixes(excluded_extensions or EXCLUDE_EXT_SET)
     max_file_size_mb = max_file_size_mb or MAX_FILE_SIZE_MB
 
     root = os.path.abspath(root)
     index = FileIndex()
-    skipped = []
-
-    # Count total files first for progress
-    total_files = 0
-    for _, _, files in os.walk(root):
-        total_files += len(files)
+    skipped: Deque[SkippedFile] = deque()
 
+    # No counting pre-pass: the previous run's file count is a good estimate, and
+    # the exact total is known once the walk has finished
+    total_files = len(cache) if cache else None
     current_file = 0
 
-    for dirpath, dirnames, filenames in os.walk(root, topdown=True):
-        # Filter out excluded directories in-place
-        dirnames[:] = [
-            d for d in dirnames
-            if d not in excluded_dirs
-        ]
-
-        for filename in filenames:
-            current_file += 1
-            filepath = os.path.join(dirpath, filename)
+    def report(rel_path: str):
+        nonlocal current_file
+        current_file += 1
+        if progress_callback:
+            total = total_files if total_files and total_files >= current_file else None
+            progress_callback(current_file, total, rel_path)
+
+    cache_hits = 0
+    pending = {}  # Future -> (filepath, rel_path, filename), hashed in the worker pool
+
+    with ThreadPoolExecutor(max_workers=hash_workers or HASH_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=1) as serial_executor, \
+            ThreadPoolExecutor(max_workers=STAT_WORKERS) as stat_executor:
+        # Hoisted out of the per-file loop
+        exclude_file = make_file_filter(excluded_extensions, max_file_size_mb)
+        add_entry = index.add_entry
+        cache_slots = cache.path_to_idx if cache else {}
+        reference_slots = reference.path_to_idx if reference and hash_policy == "on_change" else {}
+
+        tree = (
+            # Never index our own cache file
+            (entry, rel_path)
+            for entry, rel_path in _iter_tree(root, excluded_dirs, excluded_dir_pattern=excluded_dir_pattern)
+            if rel_path != INDEX_CACHE_FILENAME
+        )
+        for entry, rel_path, stat in _iter_stats(tree, None if IS_WINDOWS else stat_executor):
+            filepath = entry.path
+            filename = entry.name
+
+            if isinstance(stat, OSError):
+                report(rel_path)
+                _add_skipped(skipped, filepath, filename, f"Error reading file: {stat}", 0)
+                continue
 
-            try:
-                rel_path = normalize_path(os.path.relpath(filepath, root))
-            except ValueError:
-                # Handle edge cases (different drives, etc.)
-                rel_path = normalize_path(filename)
+            # Check exclusions (excluded directories were never entered by the walk)
+            exclude_reason = exclude_file(filename, stat.st_size)
+            if exclude_reason:
+                report(rel_path)
+                _add_skipped(skipped, filepath, filename, exclude_reason, stat.st_size)
+                continue
 
-            if progress_callback:
-                progress_callback(current_file, total_files, rel_path)
+            # Check cache - trust the digest if (size, mtime_ns, inode) are unchanged
+            # and it was hashed with the active algorithm (legacy entries are re-hashed)
+            cached = cache_slots.get(rel_path)
+            if cached is not None and _cache_entry_matches(cache, cached, stat):
+                cache_hits += 1
+                if hash_policy == "never" or not validation_freq or cache_hits % validation_freq:
+                    report(rel_path)
+                    add_entry(rel_path, cache.digests[cached], stat.st_mtime, stat.st_size,
+                              stat.st_mtime_ns, stat.st_ino)
+                    index.from_cache.add(rel_path)
+                    continue
+
+            if hash_policy == "never":
+                # Keeps the cached digests above, so the saved cache doesn't lose them
+                report(rel_path)
+                add_entry(rel_path, stat_fingerprint(rel_path, stat), stat.st_mtime,
+                          stat.st_size, stat.st_mtime_ns, stat.st_ino)
+                continue
 
-            # Check exclusions
-            exclude_reason = should_exclude(
-                filepath, excluded_dirs, excluded_extensions, max_file_size_mb
-            )
-            if exclude_reason:
-                try:
-                    size = os.path.getsize(filepath) if os.path.isfile(filepath) else 0
-                except OSError:
-                    size = 0
-                skipped.append({
-                    "path": filepath,
-                    "filename": filename,
-                    "size_mb": size / (1024 * 1024),
-                    "reason": exclude_reason
-                })
+            # on_change: copies keep their mtime, so a file whose size and mtime match
+            # the other tree's entry at the same path is taken to have the same content
+            ref = reference_slots.get(rel_path)
+            if ref is not None and _cache_entry_matches(reference, ref, stat, other_tree=True):
+                report(rel_path)
+                add_entry(rel_path, reference.digests[ref], stat.st_mtime, stat.st_size,
+                          stat.st_mtime_ns, stat.st_ino)
                 continue
 
-            try:
-                stat = os.stat(filepath)
-                file_size = stat.st_size
-                file_mtime = stat.st_mtime
-
-                # Check cache - reuse MD5 if file unchanged
-                md5 = None
-                if cache and rel_path in cache:
-                    cached = cache[rel_path]
-                    if (cached.get("size") == file_size and
-                        cached.get("mtime") == file_mtime):
-                        md5 = cached.get("md5")
-
-                # Compute MD5 if not cached
-                if md5 is None:
-                    md5 = compute_md5(filepath)
-
-                file_info = FileInfo(
-                    relative_path=rel_path,
-                    md5=md5,
-                    mtime=file_mtime,
-                    size=file_size
-                )
-                index.add(file_info)
+            # Compute digest if not cached (or due for validation)
+            pool = serial_executor if stat.st_size >= SERIAL_HASH_MIN_SIZE else executor
+            future = pool.submit(_hash_one, filepath, rel_path, stat, fast_hash)
+            pending[future] = (filepath, rel_path, filename)
 
+        # Walk finished - the total is exact from here on
+        total_files = current_file + len(pending)
+        if progress_callback and current_file and not pending:
+            progress_callback(current_file, total_files, "")
+
+        # Collect hashes on this thread, so progress callbacks stay single-threaded
+        for future in as_completed(pending):
+            filepath, rel_path, filename = pending[future]
+            report(rel_path)
+            try:
+                file_info = future.result()
             except (OSError, IOError) as e:
-                skipped.append({
-                    "path": filepath,
-                    "filename": filename,
-                    "size_mb": 0,
-                    "reason": f"Error reading file: {e}"
-                })
+                _add_skipped(skipped, filepath, filename, f"Error reading file: {e}", 0)
+                continue
+            index.add(file_info)
 
     return index, skipped
 
 
-def load_index_cache(cache_path: str) -> Optional[Dict]:
+def load_index_cache(cache_path: str) -> Optional[FileIndex]:
     """
-    Load cached index from JSON file.
-    Returns dict of {relative_path: {md5, mtime, size}} or None if not found/invalid.
+    Load cached index from JSON file, straight into a FileIndex.
+    Returns None if not found/invalid.
     """
     try:
-        with open(cache_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(cache_path, "rb") as f:
+            raw = f.read()
+        data = None
+        if orjson is not None:
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass  # e.g. escaped non-UTF-8 file names, which only json accepts
+        if data is None:
+            data = json.loads(raw)
 
         # Validate version
         if data.get("version") != INDEX_VERSION:
             return None
 
-        return data.get("files", {})
-    except (OSError, json.JSONDecodeError):
+        index = FileIndex()
+        for rel_path, entry in data.get("files", {}).items():
+            index.add_entry(
+                rel_path, entry["digest"], entry["mtime"], entry["size"],
+                entry.get("mtime_ns", 0), entry.get("ino", 0)
+            )
+        return index
+    except (OSError, KeyError, TypeError, ValueError):  # JSONDecodeError is a ValueError
         return None
 
 
-def save_index_cache(cache_path: str, index: FileIndex):
-    """Save index to JSON cache file."""
-    data = {
-        "version": INDEX_VERSION,
-        "created": datetime.now().isoformat(),
-        "files": {}
-    }
-
-    for file_info in index.all_files():
-        data["files"][file_info.relative_path] = {
-            "md5": file_info.md5,
-            "mtime": file_info.mtime,
-            "size": file_info.size
+def cache_sample_matches(root: str, cache: FileIndex, sample_size: int = CACHE_SAMPLE_SIZE) -> bool:
+    """
+    Spot-check a cache against the filesystem: stat a random sample of entries and
+    check that they still exist with the cached size and mtime.
+    """
+    sample = random.sample(list(cache.path_to_idx.items()), min(sample_size, len(cache)))
+    for rel_path, idx in sample:
+        try:
+            stat = os.stat(os.path.join(root, to_native_path(rel_path)))
+        except OSError:
+            return False
+        if not _cache_entry_matches(cache, idx, stat):
+            return False
+    return True
+
+
+def _cache_entries(index: FileIndex):
+    """Yield (relative_path, entry) in the JSON cache file's "files" format."""
+    for idx, rel_path in enumerate(index.paths):
+        if rel_path is None or index.digests[idx].startswith(STAT_FINGERPRINT_PREFIX):
+            continue  # Removed slot, or no content digest (hash_policy="never")
+        yield rel_path, {
+            "digest": index.digests[idx],
+            "mtime": index.mtimes[idx],
+            "size": index.sizes[idx],
+            "mtime_ns": index.mtimes_ns[idx],
+            "ino": index.inos[idx]
         }
 
+
+def _json_bytes(obj) -> bytes:
+    """
+    Serialize one value to compact JSON (orjson when available).
+    File names that aren't valid UTF-8 (surrogate-escaped on POSIX) are rejected
+    by orjson; json writes them as \\udcXX escapes, which load back unchanged.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def save_index_cache(cache_path: str, index: FileIndex):
+    """
+    Save index to JSON cache file.
+    Entries are streamed to the file one at a time, so the whole document is never
+    held in memory. No indentation - the cache is only read back by us.
+    """
+    header = _json_bytes({"version": INDEX_VERSION, "created": datetime.now().isoformat()})
+
     # Write atomically by writing to temp file first
     temp_path = cache_path + ".tmp"
-    with open(temp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
-    # Rename temp to final (atomic on most systems)
-    os.replace(temp_path, cache_path)
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(header[:-1] + b',"files":{')
+            first = True
+            for rel_path, entry in _cache_entries(index):
+                if not first:
+                    f.write(b",")
+                first = False
+                f.write(_json_bytes(rel_path) + b":" + _json_bytes(entry))
+            f.write(b"}}")
+
+        # Rename temp to final (atomic on most systems)
+        os.replace(temp_path, cache_path)
+    finally:
+        # Never leave a partial cache behind (it would be backed up as an orphan)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
 
 def get_cache_path(dst_root: str) -> str:
@@ -22,19 +22,35 @@ How to Use:
    python main.py config --list-excludes
 
 Features:
-- MD5-based file indexing for detecting moved/reorganized files
+- Content-hash file indexing for detecting moved/reorganized files
 - Moves files on destination instead of re-copying when reorganized
 - Cached indexes for faster subsequent backups
 - Safe deletion only after full verification
 """
-import argparse
 import os
-from backup_utils import BackupManager
+import sys
+import config
 from disk_utils import get_available_drives, is_valid_destination
 from config import MAX_FILE_SIZE_MB
 
 
+def list_drives():
+    """Print the drives available as backup destinations."""
+    drives = get_available_drives()
+    print("Available drives for backup:")
+    for drive in drives:
+        print(f"  {drive}")
+    if not drives:
+        print("  No external drives detected")
+
+
 def main():
+    # `list` takes no options: answer it without building the argument parser
+    if sys.argv[1:] == ["list"]:
+        list_drives()
+        return
+
+    import argparse
     parser = argparse.ArgumentParser(
         description="DevBackupBuddy - Smart directory backup with move detection",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -44,6 +60,7 @@ Examples:
   python main.py backup "C:/Projects" -d "E:/Backups"
   python main.py backup "C:/Projects" -d "E:/Backups" --dry-run
   python main.py backup "C:/Projects" -d "E:/Backups" --verify-only
+  python main.py config --add-exclude-dir target
         """
     )
     subparsers = parser.add_subparsers(dest="command")
@@ -75,16 +92,70 @@ Examples:
         action="store_true",
         help="Only verify existing backup, don't sync"
     )
+    backup_parser.add_argument(
+        "--fast-hash",
+        action="store_true",
+        help="Hash files over 8MB with multi-threaded BLAKE3 mmap (requires blake3)"
+    )
+    backup_parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Re-walk the destination to rebuild the index cache after syncing"
+    )
+    backup_parser.add_argument(
+        "--hash-policy",
+        choices=["always", "on_change", "never"],
+        default="always",
+        help="Hash every source file (always), only files whose size/mtime differ from "
+             "the backup (on_change), or none - compare size/mtime only, no move detection (never)"
+    )
+    backup_parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=None,
+        help="Number of threads hashing files (default: 4 per CPU, up to 32)"
+    )
+    backup_parser.add_argument(
+        "--copy-workers",
+        type=int,
+        default=None,
+        help="Number of files copied in parallel (default: 8; try 16 for network destinations)"
+    )
+    backup_parser.add_argument(
+        "--trust-cache",
+        action="store_true",
+        help="Take the destination index from its cache after a spot check, without walking it"
+    )
+    backup_parser.add_argument(
+        "--paranoid",
+        action="store_true",
+        help="Verify by re-hashing every destination file instead of comparing index digests"
+    )
+    backup_parser.add_argument(
+        "--validation-freq",
+        type=int,
+        default=0,
+        help="Re-hash every Nth file trusted from the index cache or by mtime "
+             "(default: 0, never; 100 for --verify-only without a cache)"
+    )
+
+    # Config command
+    config_parser = subparsers.add_parser("config", help="Show or change saved settings")
+    config_parser.add_argument(
+        "--list-excludes",
+        action="store_true",
+        help="List excluded directories and extensions"
+    )
+    config_parser.add_argument("--add-exclude-dir", metavar="NAME", help="Exclude a directory name")
+    config_parser.add_argument("--remove-exclude-dir", metavar="NAME", help="Stop excluding a directory name")
+    config_parser.add_argument("--add-exclude-ext", metavar="EXT", help="Exclude a file extension (e.g. .bak)")
+    config_parser.add_argument("--remove-exclude-ext", metavar="EXT", help="Stop excluding a file extension")
+    config_parser.add_argument("--max-file-size", type=int, metavar="MB", help="Set the default maximum file size")
 
     args = parser.parse_args()
 
     if args.command == "list":
-        drives = get_available_drives()
-        print("Available drives for backup:")
-        for drive in drives:
-            print(f"  {drive}")
-        if not drives:
-            print("  No external drives detected")
+        list_drives()
         return
 
     if args.command == "backup":
@@ -95,6 +166,11 @@ Examples:
             print(f"Error: Source directory does not exist: {src}")
             return
 
+        # Re-hashing the destination needs source digests, which "never" doesn't compute
+        if args.paranoid and args.hash_policy == "never":
+            print("Error: --paranoid needs content digests; use --hash-policy always or on_change")
+            return
+
         # For dry-run or verify-only, destination doesn't need to be writable
         if not args.dry_run and not args.verify_only:
             if not os.path.exists(dst):
@@ -109,7 +185,20 @@ Examples:
                 print(f"Error: Destination is not writable: {dst}")
                 return
 
-        manager = BackupManager(max_file_size_mb=args.max_file_size)
+        # Imported here so `list` and `config` don't load the indexing/sync modules
+        from backup_utils import BackupManager
+
+        manager = BackupManager(
+            max_file_size_mb=args.max_file_size,
+            validation_freq=args.validation_freq,
+            rebuild_cache=args.rebuild_cache,
+            fast_hash=args.fast_hash,
+            paranoid=args.paranoid,
+            hash_policy=args.hash_policy,
+            hash_workers=args.hash_workers,
+            trust_cache=args.trust_cache,
+            copy_workers=args.copy_workers
+        )
         manager.backup_directory(
             src, dst,
             dry_run=args.dry_run,
@@ -117,9 +206,42 @@ Examples:
         )
         return
 
+    if args.command == "config":
+        run_config_command(args)
+        return
+
     # No command specified
     parser.print_help()
 
 
+def run_config_command(args):
+    """Apply `config` changes to the saved settings, or list them."""
+    changed = False
+    if args.add_exclude_dir and args.add_exclude_dir not in config.EXCLUDE_DIRS:
+        config.EXCLUDE_DIRS.append(args.add_exclude_dir)
+        changed = True
+    if args.remove_exclude_dir in config.EXCLUDE_DIRS:
+        config.EXCLUDE_DIRS.remove(args.remove_exclude_dir)
+        changed = True
+    if args.add_exclude_ext and args.add_exclude_ext not in config.EXCLUDE_EXTENSIONS:
+        config.EXCLUDE_EXTENSIONS.append(args.add_exclude_ext)
+        changed = True
+    if args.remove_exclude_ext in config.EXCLUDE_EXTENSIONS:
+        config.EXCLUDE_EXTENSIONS.remove(args.remove_exclude_ext)
+        changed = True
+    if args.max_file_size is not None:
+        config.MAX_FILE_SIZE_MB = args.max_file_size
+        changed = True
+
+    if changed:
+        config.save_user_config()
+        print(f"Settings saved to {config.USER_CONFIG_PATH}")
+
+    if args.list_excludes or not changed:
+        print(f"Max file size: {config.MAX_FILE_SIZE_MB}MB")
+        print(f"Excluded dirs: {', '.join(sorted(config.EXCLUDE_DIRS))}")
+        print(f"Excluded extensions: {', '.join(sorted(config.EXCLUDE_EXTENSIONS))}")
+
+
 if __name__ == "__main__":
     main()
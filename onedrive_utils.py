@@ -5,9 +5,28 @@ On non-Windows systems, OneDrive checks are skipped.
 """
 import sys
 import os
+import threading
 
 IS_WINDOWS = sys.platform == "win32"
 
-def is_onedrive_file(path: str) -> bool:
-    """Simple heuristic: OneDrive in path"""
-    return IS_WINDOWS and "OneDrive" in os.path.abspath(path)
+# Placeholder attributes of cloud files whose data isn't on disk yet
+FILE_ATTRIBUTE_RECALL_ON_OPEN = 0x00040000
+FILE_ATTRIBUTE_RECALL_ON_DATA_ACCESS = 0x00400000
+ONLINE_ONLY_ATTRIBUTES = FILE_ATTRIBUTE_RECALL_ON_OPEN | FILE_ATTRIBUTE_RECALL_ON_DATA_ACCESS
+
+# Online-only files downloaded (hydrated) at once by the hashing/copy pools
+ONEDRIVE_MAX_PARALLEL = max(1, int(os.environ.get("DBB_ONEDRIVE_MAXPARALLEL", "8")))
+hydration_slots = threading.BoundedSemaphore(ONEDRIVE_MAX_PARALLEL)
+
+
+if IS_WINDOWS:
+    def is_online_only_stat(stat: os.stat_result, _mask=ONLINE_ONLY_ATTRIBUTES) -> bool:
+        """
+        Online-only check from a stat result. DirEntry.stat() carries the attributes
+        from the directory listing, so this costs no extra syscall.
+        """
+        return bool(stat.st_file_attributes & _mask)
+else:
+    def is_online_only_stat(stat: os.stat_result) -> bool:
+        """There are no cloud placeholders off Windows, so no per-file path check is needed"""
+        return False
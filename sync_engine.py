@@ -3,13 +3,46 @@ Sync engine for DevBackupBuddy.
 Generates and executes sync plans with move detection and safe deletion.
 """
 import os
+import sys
+import stat
+import errno
 import shutil
 from enum import Enum
+from collections import defaultdict
+from functools import cached_property
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple, Set
-from file_index import FileIndex, FileInfo, compute_md5, normalize_path
+from typing import List, Dict, FrozenSet, Optional, Tuple, Set
+from file_index import (
+    HASH_WORKERS, SERIAL_HASH_MIN_SIZE, STAT_FINGERPRINT_PREFIX, FileIndex, FileInfo, compute_hash,
+    mtimes_match, to_native_path
+)
+from onedrive_utils import hydration_slots, is_online_only_stat
 from config import PROJECT_TEMPLATES
 
+KERNEL_COPY_CHUNK = 1024 * 1024 * 1024  # Max bytes per copy_file_range/sendfile call
+COPY_BUFFER_SIZE = 1024 * 1024          # Userspace fallback buffer (1MB)
+COPY_BATCH_SIZE = 32                    # Copies per readahead batch
+COPY_WORKERS = 8                        # Files copied in parallel (I/O-wait dominated)
+PREFETCH_MAX_SIZE = 8 * 1024 * 1024     # Only prefetch files up to 8MB
+PLAN_ITEMS_SHOWN = 10                   # Items listed per action in the plan summary
+VERIFY_SAMPLE_FREQ = 100                # Uncached verify: re-hash 1 in N size/mtime matches
+UNBUFFERED_COPY_MIN_SIZE = 16 * 1024 * 1024  # Windows: bypass the cache manager from 16MB
+
+COPY_FILE_NO_BUFFERING = 0x00001000     # CopyFileExW flag
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _CopyFileExW = ctypes.WinDLL("kernel32", use_last_error=True).CopyFileExW
+    _CopyFileExW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_void_p,
+                             ctypes.c_void_p, ctypes.c_void_p, wintypes.DWORD]
+    _CopyFileExW.restype = wintypes.BOOL
+else:
+    _CopyFileExW = None
+
 
 class SyncAction(Enum):
     """Types of sync actions."""
@@ -28,31 +61,44 @@ class SyncItem:
     src_rel_path: Optional[str]  # Source relative path
     dst_rel_path: str          # Destination relative path
     move_from: Optional[str] = None  # For MOVE: original location on destination
+    move_from_rel: Optional[str] = None  # For MOVE: original relative path on destination
     reason: str = ""           # Human-readable reason for action
 
 
 @dataclass
 class SyncPlan:
-    """Complete sync plan with all actions."""
+    """
+    Complete sync plan with all actions.
+    The per-action lists are shared, built in one pass on first access; treat the
+    plan as read-only once created.
+    """
     items: List[SyncItem]
     src_root: str
     dst_root: str
 
+    @cached_property
+    def _by_action(self) -> Dict[SyncAction, List[SyncItem]]:
+        """Items bucketed by action (built once, not on every property access)."""
+        buckets: Dict[SyncAction, List[SyncItem]] = {action: [] for action in SyncAction}
+        for item in self.items:
+            buckets[item.action].append(item)
+        return buckets
+
     @property
     def skips(self) -> List[SyncItem]:
-        return [i for i in self.items if i.action == SyncAction.SKIP]
+        return self._by_action[SyncAction.SKIP]
 
     @property
     def copies(self) -> List[SyncItem]:
-        return [i for i in self.items if i.action == SyncAction.COPY]
+        return self._by_action[SyncAction.COPY]
 
     @property
     def moves(self) -> List[SyncItem]:
-        return [i for i in self.items if i.action == SyncAction.MOVE]
+        return self._by_action[SyncAction.MOVE]
 
     @property
     def deletes(self) -> List[SyncItem]:
-        return [i for i in self.items if i.action == SyncAction.DELETE]
+        return self._by_action[SyncAction.DELETE]
 
 
 def _find_best_move_candidate(
@@ -62,83 +108,118 @@ def _find_best_move_candidate(
     dst_root: str
 ) -> Optional[FileInfo]:
     """
-    Find the best destination file to move from among candidates with same MD5.
+    Find the best destination file to move from among candidates with same digest.
     Priority: 1) Same filename, 2) Shortest path distance
     """
     if not dst_candidates:
         return None
+    if len(dst_candidates) == 1:
+        return dst_candidates[0]
 
-    src_filename = os.path.basename(src_file.relative_path)
+    # Split every path once; the filename and directory components are reused below
+    src_parts = src_file.relative_path.split("/")
+    src_dirs = src_parts[:-1]
+    split = [(c, c.relative_path.split("/")) for c in dst_candidates]
 
     # First, try to find a candidate with the same filename
-    same_name = [c for c in dst_candidates if os.path.basename(c.relative_path) == src_filename]
-    if same_name:
-        # If multiple with same name, pick shortest path distance
-        return min(same_name, key=lambda c: _path_distance(src_file.relative_path, c.relative_path))
+    same_name = [(c, parts) for c, parts in split if parts[-1] == src_parts[-1]]
 
-    # Otherwise, pick the one with shortest path distance
-    return min(dst_candidates, key=lambda c: _path_distance(src_file.relative_path, c.relative_path))
+    # Pick the shortest path distance among those, or among all candidates
+    best, _ = min(same_name or split, key=lambda cp: _path_distance(src_dirs, cp[1][:-1]))
+    return best
 
 
-def _path_distance(path1: str, path2: str) -> int:
-    """Calculate a simple distance metric between two paths."""
-    parts1 = path1.split("/")
-    parts2 = path2.split("/")
+def _path_distance(dirs1: List[str], dirs2: List[str]) -> int:
+    """Calculate a simple distance metric between two paths, given their directory components."""
+    depth1, depth2 = len(dirs1), len(dirs2)
 
-    # Count differing directory levels
-    common_prefix_len = 0
-    for p1, p2 in zip(parts1[:-1], parts2[:-1]):
-        if p1 == p2:
-            common_prefix_len += 1
-        else:
-            break
+    # Count shared leading directory levels; the rest differ
+    common = 0
+    limit = min(depth1, depth2)
+    while common < limit and dirs1[common] == dirs2[common]:
+        common += 1
+
+    return depth1 + depth2 - 2 * common
 
-    return (len(parts1) - 1 - common_prefix_len) + (len(parts2) - 1 - common_prefix_len)
 
+def _build_marker_index() -> Tuple[Dict[str, List[str]], dict]:
+    """
+    Index PROJECT_TEMPLATES marker files for detect_project_roots.
+
+    Returns:
+        (simple, suffix_trie): simple maps a bare filename marker to its project
+        types; suffix_trie holds markers with subdirectories, keyed by path
+        component from the filename backwards (e.g. 'src/App.tsx' is stored under
+        ['App.tsx']['src']). A node's None key lists (project_type, marker depth)
+        for the markers ending there.
+    """
+    simple: Dict[str, List[str]] = {}
+    suffix_trie: dict = {}
+    for project_type, template in PROJECT_TEMPLATES.items():
+        for marker in template['marker_files']:
+            components = marker.split('/')
+            if len(components) == 1:
+                simple.setdefault(marker, []).append(project_type)
+                continue
+            node = suffix_trie
+            for component in reversed(components):
+                node = node.setdefault(component, {})
+            node.setdefault(None, []).append((project_type, len(components)))
+    return simple, suffix_trie
 
-def detect_project_roots(src_index: FileIndex) -> Dict[str, Set[str]]:
+
+_SIMPLE_MARKERS, _MARKER_TRIE = _build_marker_index()
+_MARKER_FILENAMES = frozenset(_SIMPLE_MARKERS).union(_MARKER_TRIE)  # Last component of any marker
+
+
+def detect_project_roots(src_index: FileIndex) -> Dict[str, FrozenSet[str]]:
     """
     Detect project roots by looking for marker files.
-    
+
+    A path whose filename ends no marker (nearly all of them) costs one set lookup;
+    only paths whose filename ends a subdirectory marker (e.g. 'src/App.tsx') are
+    split and walked further up the suffix trie.
+
     Returns:
-        Dict mapping project_path (e.g., 'my-app') to set of detected project types
+        Dict mapping project_path (e.g., 'my-app') to a frozenset of detected project types
     """
-    project_roots: Dict[str, Set[str]] = {}
-    
-    for file_info in src_index.all_files():
-        filename = os.path.basename(file_info.relative_path)
-        
-        for project_type, template in PROJECT_TEMPLATES.items():
-            for marker in template['marker_files']:
-                # Handle markers that include subdirectories (e.g., 'src/App.tsx')
-                if '/' in marker:
-                    if file_info.relative_path.endswith(marker):
-                        # Get project root by removing the marker path
-                        marker_depth = marker.count('/') + 1
-                        parts = file_info.relative_path.split('/')
-                        if len(parts) > marker_depth:
-                            project_root = '/'.join(parts[:-marker_depth])
-                        else:
-                            project_root = ''
-                        
-                        if project_root not in project_roots:
-                            project_roots[project_root] = set()
-                        project_roots[project_root].add(project_type)
-                else:
-                    # Simple filename marker
-                    if filename == marker:
-                        # Get the directory containing this file as the project root
-                        parts = file_info.relative_path.split('/')
-                        if len(parts) > 1:
-                            project_root = '/'.join(parts[:-1])
-                        else:
-                            project_root = ''
-                        
-                        if project_root not in project_roots:
-                            project_roots[project_root] = set()
-                        project_roots[project_root].add(project_type)
-    
-    return project_roots
+    project_roots: Dict[str, Set[str]] = defaultdict(set)
+
+    for rel_path in src_index.path_to_idx:
+        parent, _, filename = rel_path.rpartition('/')
+        if filename not in _MARKER_FILENAMES:
+            continue
+
+        # Simple filename marker: the directory containing it is the project root
+        project_types = _SIMPLE_MARKERS.get(filename)
+        if project_types:
+            project_roots[parent].update(project_types)
+
+        # Markers that include subdirectories: the root is above the marker path
+        node = _MARKER_TRIE.get(filename)
+        if node is None:
+            continue
+        parts = rel_path.split('/')
+        depth = 1
+        while True:
+            for project_type, marker_depth in node.get(None, ()):
+                project_root = '/'.join(parts[:-marker_depth])
+                project_roots[project_root].add(project_type)
+            depth += 1
+            if depth > len(parts):
+                break
+            node = node.get(parts[-depth])
+            if node is None:
+                break
+
+    # Freeze each root's types, sharing one frozenset per distinct combination
+    # (most roots are one of a few kinds, e.g. {'nodejs', 'git'})
+    shared: Dict[FrozenSet[str], FrozenSet[str]] = {}
+    frozen_roots: Dict[str, FrozenSet[str]] = {}
+    for project_root, types in project_roots.items():
+        key = frozenset(types)
+        frozen_roots[project_root] = shared.setdefault(key, key)
+    return frozen_roots
 
 
 def build_always_copy_map(project_roots: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
@@ -148,8 +229,8 @@ def build_always_copy_map(project_roots: Dict[str, Set[str]]) -> Dict[str, Set[s
     Returns:
         Dict mapping relative file path to set of project roots it belongs to
     """
-    always_copy_map: Dict[str, Set[str]] = {}
-    
+    always_copy_map: Dict[str, Set[str]] = defaultdict(set)
+
     for project_root, project_types in project_roots.items():
         for project_type in project_types:
             template = PROJECT_TEMPLATES.get(project_type, {})
@@ -158,21 +239,51 @@ def build_always_copy_map(project_roots: Dict[str, Set[str]]) -> Dict[str, Set[s
                     file_path = f"{project_root}/{filename}"
                 else:
                     file_path = filename
-                
-                if file_path not in always_copy_map:
-                    always_copy_map[file_path] = set()
                 always_copy_map[file_path].add(project_root)
-    
-    return always_copy_map
+
+    return dict(always_copy_map)
 
 
-def get_project_root(file_path: str, project_roots: Dict[str, Set[str]]) -> Optional[str]:
+def build_project_root_trie(project_roots: Dict[str, Set[str]]) -> dict:
+    """
+    Nest detected project roots by path component, for get_project_root.
+    A node's None key marks a project root ending at that node.
+    """
+    trie: dict = {}
+    for project_root in project_roots:
+        node = trie
+        if project_root:
+            for component in project_root.split('/'):
+                node = node.setdefault(component, {})
+        node[None] = True
+    return trie
+
+
+def get_project_root(
+    file_path: str,
+    project_roots: Dict[str, Set[str]],
+    root_trie: Optional[dict] = None
+) -> Optional[str]:
     """
     Get the project root that a file belongs to.
     Returns the longest matching project root, or None if not in a detected project.
+
+    With root_trie (from build_project_root_trie) the path is walked down once,
+    stopping at the first directory no project root passes through.
     """
     parts = file_path.split('/')
-    
+
+    if root_trie is not None:
+        node = root_trie
+        match_depth = 0 if None in node else None
+        for depth, component in enumerate(parts[:-1], 1):
+            node = node.get(component)
+            if node is None:
+                break
+            if None in node:
+                match_depth = depth
+        return None if match_depth is None else '/'.join(parts[:match_depth])
+
     # Try progressively shorter paths to find the project root
     for i in range(len(parts) - 1, -1, -1):
         candidate = '/'.join(parts[:i]) if i > 0 else ''
@@ -186,26 +297,37 @@ def is_cross_project_move(
     src_path: str,
     candidate_path: str,
     project_roots: Dict[str, Set[str]],
-    always_copy_map: Dict[str, Set[str]]
+    always_copy_map: Dict[str, Set[str]],
+    root_trie: Optional[dict] = None
 ) -> bool:
     """
     Check if a potential move is actually a cross-project copy of a boilerplate file.
-    
+    root_trie (from build_project_root_trie) speeds up the project lookups.
+
     Returns True if this should be treated as COPY instead of MOVE.
     """
-    src_filename = os.path.basename(src_path)
-    
-    # Check if the source file is in the always-copy map
-    if src_path in always_copy_map:
-        # Get project roots for source and candidate
-        src_project = get_project_root(src_path, project_roots)
-        candidate_project = get_project_root(candidate_path, project_roots)
-        
-        # If they're in different projects, don't treat as move
-        if src_project != candidate_project:
-            return True
-    
-    return False
+    # Only always-copy (boilerplate) files can be cross-project copies; most files
+    # are rejected here, before any project root is looked up
+    if src_path not in always_copy_map:
+        return False
+
+    # If they're in different projects, don't treat as move
+    src_project = get_project_root(src_path, project_roots, root_trie)
+    return get_project_root(candidate_path, project_roots, root_trie) != src_project
+
+
+def _same_content(src_digest: str, src_size: int, src_mtime_ns: int,
+                  dst_index: FileIndex, dst_slot: int) -> bool:
+    """
+    Check if the destination file in dst_slot holds the source file's content:
+    equal digests, or - when either side has a stat fingerprint (hash_policy="never") -
+    equal sizes and mtimes within MODIFY_WINDOW_NS.
+    """
+    dst_digest = dst_index.digests[dst_slot]
+    if src_digest.startswith(STAT_FINGERPRINT_PREFIX) or dst_digest.startswith(STAT_FINGERPRINT_PREFIX):
+        return (dst_index.sizes[dst_slot] == src_size and
+                mtimes_match(dst_index.mtimes_ns[dst_slot], src_mtime_ns))
+    return dst_digest == src_digest
 
 
 
@@ -223,23 +345,43 @@ def generate_sync_plan(
     """
     items: List[SyncItem] = []
 
-    # Track which destination files are "used" by a move
-    used_dst_paths = set()
+    # Destination slots "used" as the source of a move (1 = used): a byte per
+    # slot instead of hashing relative paths into a set
+    used_dst_slots = bytearray(len(dst_index.paths))
+
+    # Move sources, by digest: only destination files with no source file at the
+    # same path (that one always claims them). Slots are removed once moved from,
+    # so candidates never need filtering. The same files are the delete candidates
+    src_paths = src_index.path_to_idx
+    dst_slots = dst_index.path_to_idx
+    dst_digests = dst_index.digests
+    free_by_digest: Dict[str, List[int]] = {}
+    orphans: List[Tuple[str, int]] = []  # (path, slot) of destination files not in source
+    for path, idx in dst_slots.items():
+        if path not in src_paths:
+            free_by_digest.setdefault(dst_digests[idx], []).append(idx)
+            orphans.append((path, idx))
 
     # Detect project roots and build always-copy map for smart move detection
     project_roots = detect_project_roots(src_index)
     always_copy_map = build_always_copy_map(project_roots)
+    root_trie = build_project_root_trie(project_roots)
+
+    # Roots with a trailing separator: full paths are built by concatenation
+    src_prefix = os.path.join(src_root, "")
+    dst_prefix = os.path.join(dst_root, "")
 
     # Process each source file
     for src_file in src_index.all_files():
-        src_full = os.path.join(src_root, src_file.relative_path.replace("/", os.sep))
-        dst_full = os.path.join(dst_root, src_file.relative_path.replace("/", os.sep))
+        native_rel = to_native_path(src_file.relative_path)
+        src_full = src_prefix + native_rel
+        dst_full = dst_prefix + native_rel
 
         # Check if file exists at same path in destination
-        dst_file = dst_index.get_by_path(src_file.relative_path)
+        dst_slot = dst_slots.get(src_file.relative_path)
 
-        if dst_file:
-            if dst_file.md5 == src_file.md5:
+        if dst_slot is not None:
+            if _same_content(src_file.digest, src_file.size, src_file.mtime_ns, dst_index, dst_slot):
                 # Same path, same content -> SKIP
                 items.append(SyncItem(
                     action=SyncAction.SKIP,
@@ -249,7 +391,6 @@ def generate_sync_plan(
                     dst_rel_path=src_file.relative_path,
                     reason="Up-to-date"
                 ))
-                used_dst_paths.add(src_file.relative_path)
             else:
                 # Same path, different content -> COPY (update)
                 items.append(SyncItem(
@@ -260,12 +401,10 @@ def generate_sync_plan(
                     dst_rel_path=src_file.relative_path,
                     reason="Content changed"
                 ))
-                used_dst_paths.add(src_file.relative_path)
         else:
-            # File doesn't exist at same path - check for move (same MD5 elsewhere)
-            candidates = dst_index.get_by_md5(src_file.md5)
-            # Filter out already-used candidates
-            candidates = [c for c in candidates if c.relative_path not in used_dst_paths]
+            # File doesn't exist at same path - check for move (same content elsewhere)
+            bucket = free_by_digest.get(src_file.digest)
+            candidates = [dst_index.info(idx) for idx in bucket] if bucket else []
 
             move_candidate = _find_best_move_candidate(src_file, candidates, src_root, dst_root)
 
@@ -274,7 +413,8 @@ def generate_sync_plan(
                 src_file.relative_path,
                 move_candidate.relative_path,
                 project_roots,
-                always_copy_map
+                always_copy_map,
+                root_trie
             ):
                 # This is identical boilerplate across different projects - COPY, not MOVE
                 items.append(SyncItem(
@@ -287,7 +427,7 @@ def generate_sync_plan(
                 ))
             elif move_candidate:
                 # Found file with same content at different location -> MOVE
-                move_from = os.path.join(dst_root, move_candidate.relative_path.replace("/", os.sep))
+                move_from = dst_prefix + to_native_path(move_candidate.relative_path)
                 items.append(SyncItem(
                     action=SyncAction.MOVE,
                     src_path=src_full,
@@ -295,9 +435,12 @@ def generate_sync_plan(
                     src_rel_path=src_file.relative_path,
                     dst_rel_path=src_file.relative_path,
                     move_from=move_from,
+                    move_from_rel=move_candidate.relative_path,
                     reason=f"Moved from {move_candidate.relative_path}"
                 ))
-                used_dst_paths.add(move_candidate.relative_path)
+                moved_slot = dst_slots[move_candidate.relative_path]
+                used_dst_slots[moved_slot] = 1
+                bucket.remove(moved_slot)
             else:
                 # File not found anywhere in destination -> COPY (new)
                 items.append(SyncItem(
@@ -309,21 +452,18 @@ def generate_sync_plan(
                     reason="New file"
                 ))
 
-    # Find files in destination that aren't in source (candidates for deletion)
-    for dst_file in dst_index.all_files():
-        if dst_file.relative_path not in used_dst_paths:
-            src_file = src_index.get_by_path(dst_file.relative_path)
-            if not src_file:
-                # File exists in destination but not source -> DELETE
-                dst_full = os.path.join(dst_root, dst_file.relative_path.replace("/", os.sep))
-                items.append(SyncItem(
-                    action=SyncAction.DELETE,
-                    src_path=None,
-                    dst_path=dst_full,
-                    src_rel_path=None,
-                    dst_rel_path=dst_file.relative_path,
-                    reason="Not in source"
-                ))
+    # Destination files not in source and not moved from -> DELETE
+    for path, idx in orphans:
+        if not used_dst_slots[idx]:
+            # File exists in destination but not source -> DELETE
+            items.append(SyncItem(
+                action=SyncAction.DELETE,
+                src_path=None,
+                dst_path=dst_prefix + to_native_path(path),
+                src_rel_path=None,
+                dst_rel_path=path,
+                reason="Not in source"
+            ))
 
     return SyncPlan(items=items, src_root=src_root, dst_root=dst_root)
 
@@ -337,16 +477,182 @@ class SyncResult:
     skipped: int = 0
     errors: List[Dict] = None
     verification_passed: bool = True
+    copied_paths: List[str] = None              # Relative paths copied to destination
+    moved_paths: List[Tuple[str, str]] = None   # (old_rel_path, new_rel_path) moved on destination
+    deleted_paths: List[str] = None             # Relative paths deleted from destination
 
     def __post_init__(self):
         if self.errors is None:
             self.errors = []
+        if self.copied_paths is None:
+            self.copied_paths = []
+        if self.moved_paths is None:
+            self.moved_paths = []
+        if self.deleted_paths is None:
+            self.deleted_paths = []
+
+
+def _copy_in_kernel(src_fd: int, dst_fd: int) -> bool:
+    """
+    Copy file data without passing it through userspace.
+    Uses os.copy_file_range (reflink/server-side copy on btrfs, XFS, NFS...)
+    and falls back to os.sendfile on Linux.
+
+    Returns:
+        False if no in-kernel method is available (nothing was copied)
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(src_fd, dst_fd, KERNEL_COPY_CHUNK):
+                pass
+            return True
+        except OSError:
+            # Unsupported here (old kernel, cross-filesystem...) - only safe to
+            # fall back if nothing was written yet
+            if os.lseek(dst_fd, 0, os.SEEK_CUR):
+                raise
+
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        offset = 0
+        try:
+            while True:
+                sent = os.sendfile(dst_fd, src_fd, offset, KERNEL_COPY_CHUNK)
+                if not sent:
+                    return True
+                offset += sent
+        except OSError:
+            if offset:
+                raise
+
+    return False
+
+
+def _prefetch_sources(items: List[SyncItem]):
+    """
+    Ask the kernel to start reading a batch of small source files, so their reads
+    are queued on the device together instead of one file at a time.
+    No-op where posix_fadvise is unavailable (Windows, macOS).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    for item in items:
+        try:
+            fd = os.open(item.src_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            if os.fstat(fd).st_size <= PREFETCH_MAX_SIZE:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _copy_file_windows(src: str, dst: str):
+    """
+    Copy a file with CopyFileExW: data, attributes and timestamps in one call,
+    done by the OS (block cloning on ReFS, server-side copy on SMB shares).
+    Large files are copied unbuffered, so they don't flush the file cache.
+    OneDrive placeholders are hydrated by the copy itself; they take a
+    hydration slot so the copy pool doesn't start too many downloads at once.
+    Falls back to shutil.copy2 if the call fails.
+    """
+    src_stat = os.stat(src)
+    flags = COPY_FILE_NO_BUFFERING if src_stat.st_size >= UNBUFFERED_COPY_MIN_SIZE else 0
+    if is_online_only_stat(src_stat):
+        with hydration_slots:
+            copied = _CopyFileExW(src, dst, None, None, None, flags)
+    else:
+        copied = _CopyFileExW(src, dst, None, None, None, flags)
+    if not copied:
+        shutil.copy2(src, dst)
+
+
+def _copy_userspace(fsrc, fdst):
+    """Copy file data through one preallocated buffer (readinto, no per-chunk allocation)."""
+    buf = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buf)
+    readinto = fsrc.readinto
+    write = fdst.write
+    while True:
+        n = readinto(buf)
+        if not n:
+            break
+        write(view[:n])
+
+
+def _fast_copy(src: str, dst: str, src_stat: Optional[os.stat_result] = None):
+    """
+    Copy a file like shutil.copy2, but with the data copied in-kernel where possible.
+    The source is stat'ed once (fstat on the open file unless src_stat is given);
+    timestamps and permission bits are then set from that one result.
+    """
+    if _CopyFileExW is not None:
+        _copy_file_windows(src, dst)
+        return
+
+    if sys.platform == "darwin":
+        # shutil.copyfile uses fcopyfile() here; os.sendfile only targets sockets
+        if src_stat is None:
+            src_stat = os.stat(src)
+        shutil.copyfile(src, dst)
+    else:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            if src_stat is None:
+                src_stat = os.fstat(fsrc.fileno())
+            if not _copy_in_kernel(fsrc.fileno(), fdst.fileno()):
+                _copy_userspace(fsrc, fdst)
+
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    os.chmod(dst, stat.S_IMODE(src_stat.st_mode))
+
+
+def _copy_item(item: SyncItem):
+    """Copy one planned file (runs in the copy pool; its directory already exists)."""
+    _fast_copy(item.src_path, item.dst_path)
+
+
+def _make_dirs(dirs: Set[str]):
+    """
+    Create a set of directories with one os.makedirs per leaf: deepest paths go
+    first, and every directory they create (their ancestors) is then skipped.
+    """
+    created = set()
+    for d in sorted(dirs, key=len, reverse=True):
+        if d in created:
+            continue
+        os.makedirs(d, exist_ok=True)
+        while d not in created:
+            created.add(d)
+            parent = os.path.dirname(d)
+            if parent == d:
+                break
+            d = parent
+
+
+def _move_file(src: str, dst: str):
+    """
+    Move a file within the destination tree.
+
+    Tries a single rename first (no data touched, no stat calls); only if it fails
+    with EXDEV (e.g. a mount point inside the backup) fall back to shutil.move's
+    copy + delete.
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
 
 
 def execute_sync_plan(
     plan: SyncPlan,
     dry_run: bool = False,
-    progress_callback=None
+    progress_callback=None,
+    copy_workers: Optional[int] = None
 ) -> SyncResult:
     """
     Execute a sync plan.
@@ -362,6 +668,7 @@ def execute_sync_plan(
         plan: The sync plan to execute
         dry_run: If True, don't actually perform operations
         progress_callback: Optional callback(action, item, current, total)
+        copy_workers: Files copied in parallel (default COPY_WORKERS)
 
     Returns:
         SyncResult with counts and any errors
@@ -376,8 +683,7 @@ def execute_sync_plan(
         needed_dirs.add(os.path.dirname(item.dst_path))
 
     if not dry_run:
-        for d in needed_dirs:
-            os.makedirs(d, exist_ok=True)
+        _make_dirs(needed_dirs)
 
     # Phase 2: Execute moves
     for item in plan.moves:
@@ -390,10 +696,9 @@ def execute_sync_plan(
             continue
 
         try:
-            # Ensure target directory exists
-            os.makedirs(os.path.dirname(item.dst_path), exist_ok=True)
-            shutil.move(item.move_from, item.dst_path)
+            _move_file(item.move_from, item.dst_path)
             result.moved += 1
+            result.moved_paths.append((item.move_from_rel, item.dst_rel_path))
         except (OSError, IOError) as e:
             result.errors.append({
                 "action": "move",
@@ -403,41 +708,130 @@ def execute_sync_plan(
             })
 
     # Phase 3: Execute copies
-    for item in plan.copies:
-        current_op += 1
-        if progress_callback:
-            progress_callback("copy", item, current_op, total_ops)
-
-        if dry_run:
+    copies = plan.copies
+    if dry_run:
+        for item in copies:
+            current_op += 1
+            if progress_callback:
+                progress_callback("copy", item, current_op, total_ops)
             result.copied += 1
-            continue
+        copies = []
+
+    def collect(done):
+        # Runs on this thread, so progress callbacks and results stay single-threaded
+        nonlocal current_op
+        for future in done:
+            item = pending.pop(future)
+            current_op += 1
+            if progress_callback:
+                progress_callback("copy", item, current_op, total_ops)
+            try:
+                future.result()
+                result.copied += 1
+                result.copied_paths.append(item.dst_rel_path)
+            except (OSError, IOError) as e:
+                result.errors.append({
+                    "action": "copy",
+                    "path": item.src_path,
+                    "target": item.dst_path,
+                    "error": str(e)
+                })
 
-        try:
-            os.makedirs(os.path.dirname(item.dst_path), exist_ok=True)
-            shutil.copy2(item.src_path, item.dst_path)
-            result.copied += 1
-        except (OSError, IOError) as e:
-            result.errors.append({
-                "action": "copy",
-                "path": item.src_path,
-                "target": item.dst_path,
-                "error": str(e)
-            })
+    pending = {}  # Future -> SyncItem
+    with ThreadPoolExecutor(max_workers=copy_workers or COPY_WORKERS) as executor:
+        for i in range(0, len(copies), COPY_BATCH_SIZE):
+            # Prefetch each batch of sources, then queue it behind the previous
+            # batch, so the pool never drains while a batch is being prefetched
+            batch = copies[i:i + COPY_BATCH_SIZE]
+            _prefetch_sources(batch)
+            for item in batch:
+                pending[executor.submit(_copy_item, item)] = item
+
+            # Keep at most two batches in flight
+            while len(pending) > COPY_BATCH_SIZE:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+
+        collect(as_completed(list(pending)))
 
     result.skipped = len(plan.skips)
     return result
 
 
+def _verify_one(src_file: FileInfo, dst_path: str, trust_mtime: bool = False) -> Optional[Dict]:
+    """
+    Check one destination file against its source entry (runs in the hashing pool).
+    With trust_mtime, a file whose size and mtime match the source is accepted
+    without reading it (copies and moves keep the source's mtime).
+    Sources indexed with hash_policy="never" carry no content digest; they are
+    checked by size and mtime only. Mtimes match to within MODIFY_WINDOW_NS, as
+    FAT32 and exFAT destinations round them.
+    """
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return {
+            "path": src_file.relative_path,
+            "reason": "File missing in destination"
+        }
+    except OSError as e:
+        return {
+            "path": src_file.relative_path,
+            "reason": f"Error reading destination: {e}"
+        }
+
+    try:
+        # Quick check: size must match
+        if dst_stat.st_size != src_file.size:
+            return {
+                "path": src_file.relative_path,
+                "reason": f"Size mismatch: source={src_file.size}, dest={dst_stat.st_size}"
+            }
+        if src_file.digest.startswith(STAT_FINGERPRINT_PREFIX):
+            if not mtimes_match(dst_stat.st_mtime_ns, src_file.mtime_ns):
+                return {
+                    "path": src_file.relative_path,
+                    "reason": f"Modified: source mtime_ns={src_file.mtime_ns}, "
+                              f"dest mtime_ns={dst_stat.st_mtime_ns}"
+                }
+            return None
+        if trust_mtime and src_file.mtime_ns and mtimes_match(dst_stat.st_mtime_ns, src_file.mtime_ns):
+            return None
+
+        # Full check: content digest must match
+        dst_digest = compute_hash(dst_path, dst_stat.st_size,
+                                  online_only=is_online_only_stat(dst_stat))
+        if dst_digest != src_file.digest:
+            return {
+                "path": src_file.relative_path,
+                "reason": f"Digest mismatch: source={src_file.digest}, dest={dst_digest}"
+            }
+    except (OSError, IOError) as e:
+        return {
+            "path": src_file.relative_path,
+            "reason": f"Error reading destination: {e}"
+        }
+    return None
+
+
 def verify_mirror(
     src_index: FileIndex,
     dst_root: str,
-    progress_callback=None
+    progress_callback=None,
+    hash_workers: Optional[int] = None,
+    trust_mtime: bool = False,
+    validation_freq: int = 0
 ) -> Tuple[bool, List[Dict]]:
     """
     Verify that destination mirrors source correctly.
 
     Checks that every file in source exists at the correct path in destination
-    with matching MD5.
+    with matching content digest. Destination files are re-hashed concurrently
+    (hash_workers threads, default HASH_WORKERS); files of SERIAL_HASH_MIN_SIZE
+    and up share one extra thread, as in build_index.
+
+    With trust_mtime, files whose size and mtime match the source are not re-hashed,
+    except one in every validation_freq files (0 = none), starting with the first,
+    which is always hashed in full.
 
     Returns:
         Tuple of (success: bool, mismatches: list of {path, reason})
@@ -446,42 +840,82 @@ def verify_mirror(
     total = len(src_index)
     current = 0
 
-    for src_file in src_index.all_files():
-        current += 1
-        if progress_callback:
-            progress_callback(current, total, src_file.relative_path)
+    with ThreadPoolExecutor(max_workers=hash_workers or HASH_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=1) as serial_executor:
+        futures = {}
+        dst_prefix = os.path.join(dst_root, "")
+        for i, src_file in enumerate(src_index.all_files()):
+            dst_path = dst_prefix + to_native_path(src_file.relative_path)
+            pool = serial_executor if src_file.size >= SERIAL_HASH_MIN_SIZE else executor
+            trust = trust_mtime and not (validation_freq and i % validation_freq == 0)
+            futures[pool.submit(_verify_one, src_file, dst_path, trust)] = src_file
+
+        # Collect on this thread, so progress callbacks and results stay single-threaded
+        for future in as_completed(futures):
+            current += 1
+            if progress_callback:
+                progress_callback(current, total, futures[future].relative_path)
+            mismatch = future.result()
+            if mismatch:
+                mismatches.append(mismatch)
+
+    # Report in a stable order, whatever order the hashes finished in
+    mismatches.sort(key=lambda m: m["path"])
+    return len(mismatches) == 0, mismatches
+
+
+def verify_mirror_from_indexes(
+    src_index: FileIndex,
+    dst_index: FileIndex
+) -> Tuple[bool, List[Dict]]:
+    """
+    Verify that destination mirrors source using already-known digests.
 
-        dst_path = os.path.join(dst_root, src_file.relative_path.replace("/", os.sep))
+    Same checks as verify_mirror, but compares the digests held in both indexes
+    instead of re-reading every destination file. dst_index must reflect the
+    destination after the sync (see BackupManager._apply_transfers_to_index).
 
-        if not os.path.exists(dst_path):
+    Returns:
+        Tuple of (success: bool, mismatches: list of {path, reason})
+    """
+    mismatches = []
+    dst_slots = dst_index.path_to_idx
+
+    for idx, rel_path in enumerate(src_index.paths):
+        if rel_path is None:
+            continue  # Removed slot
+
+        dst_idx = dst_slots.get(rel_path)
+        if dst_idx is None:
             mismatches.append({
-                "path": src_file.relative_path,
+                "path": rel_path,
                 "reason": "File missing in destination"
             })
             continue
 
-        try:
-            dst_stat = os.stat(dst_path)
-            # Quick check: size must match
-            if dst_stat.st_size != src_file.size:
-                mismatches.append({
-                    "path": src_file.relative_path,
-                    "reason": f"Size mismatch: source={src_file.size}, dest={dst_stat.st_size}"
-                })
-                continue
-
-            # Full check: MD5 must match
-            dst_md5 = compute_md5(dst_path)
-            if dst_md5 != src_file.md5:
-                mismatches.append({
-                    "path": src_file.relative_path,
-                    "reason": f"MD5 mismatch: source={src_file.md5}, dest={dst_md5}"
-                })
+        src_size = src_index.sizes[idx]
+        dst_size = dst_index.sizes[dst_idx]
+        if dst_size != src_size:
+            mismatches.append({
+                "path": rel_path,
+                "reason": f"Size mismatch: source={src_size}, dest={dst_size}"
+            })
+            continue
 
-        except (OSError, IOError) as e:
+        src_digest = src_index.digests[idx]
+        dst_digest = dst_index.digests[dst_idx]
+        if _same_content(src_digest, src_size, src_index.mtimes_ns[idx], dst_index, dst_idx):
+            continue
+        if src_digest.startswith(STAT_FINGERPRINT_PREFIX) or dst_digest.startswith(STAT_FINGERPRINT_PREFIX):
             mismatches.append({
-                "path": src_file.relative_path,
-                "reason": f"Error reading destination: {e}"
+                "path": rel_path,
+                "reason": f"Modified: source mtime_ns={src_index.mtimes_ns[idx]}, "
+                          f"dest mtime_ns={dst_index.mtimes_ns[dst_idx]}"
+            })
+        else:
+            mismatches.append({
+                "path": rel_path,
+                "reason": f"Digest mismatch: source={src_digest}, dest={dst_digest}"
             })
 
     return len(mismatches) == 0, mismatches
@@ -490,11 +924,13 @@ def verify_mirror(
 def execute_deletes(
     plan: SyncPlan,
     dry_run: bool = False,
-    progress_callback=None
+    progress_callback=None,
+    result: Optional[SyncResult] = None
 ) -> Tuple[int, List[Dict]]:
     """
     Execute delete operations from the sync plan.
     Should only be called after verification passes.
+    If result is given, deleted relative paths are recorded in result.deleted_paths.
 
     Returns:
         Tuple of (deleted_count, errors)
@@ -514,6 +950,8 @@ def execute_deletes(
         try:
             os.remove(item.dst_path)
             deleted += 1
+            if result is not None:
+                result.deleted_paths.append(item.dst_rel_path)
         except (OSError, IOError) as e:
             errors.append({
                 "path": item.dst_path,
@@ -525,29 +963,47 @@ def execute_deletes(
 
 def cleanup_empty_dirs(root: str, dry_run: bool = False) -> int:
     """
-    Remove empty directories under root (bottom-up).
+    Remove empty directories under root (bottom-up), including directories that
+    only held empty directories.
+
+    Each directory is read once with os.scandir (directory entries need no stat)
+    and only directories are remembered, not files.
 
     Returns:
         Number of directories removed
     """
+    dirs: List[Tuple[str, int]] = []  # (path, parent's position), parents before children
+    remaining: List[int] = []         # Entries per directory not (yet) removed
+    stack = [(root, -1)]
+    while stack:
+        dirpath, parent = stack.pop()
+        pos = len(dirs)
+        dirs.append((dirpath, parent))
+        count = 0
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    count += 1
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, pos))
+        except OSError:
+            count = 1  # Unreadable - never treat as empty
+        remaining.append(count)
+
+    # Children come after their parent, so walking backwards is bottom-up.
+    # Position 0 is root itself, which is kept
     removed = 0
-
-    # Walk bottom-up
-    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
-        # Skip root itself
-        if dirpath == root:
+    for pos in range(len(dirs) - 1, 0, -1):
+        if remaining[pos]:
             continue
-
-        # Check if directory is empty (no files, no subdirs)
-        if not dirnames and not filenames:
-            if not dry_run:
-                try:
-                    os.rmdir(dirpath)
-                    removed += 1
-                except OSError:
-                    pass
-            else:
-                removed += 1
+        dirpath, parent = dirs[pos]
+        if not dry_run:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                continue
+        removed += 1
+        remaining[parent] -= 1
 
     return removed
 
@@ -563,24 +1019,24 @@ def print_sync_plan_summary(plan: SyncPlan):
 
     if plan.moves:
         print("Files to MOVE:")
-        for item in plan.moves[:10]:  # Show first 10
+        for item in islice(plan.moves, PLAN_ITEMS_SHOWN):
             print(f"  {item.move_from} -> {item.dst_path}")
-        if len(plan.moves) > 10:
-            print(f"  ... and {len(plan.moves) - 10} more")
+        if len(plan.moves) > PLAN_ITEMS_SHOWN:
+            print(f"  ... and {len(plan.moves) - PLAN_ITEMS_SHOWN} more")
         print()
 
     if plan.copies:
         print("Files to COPY:")
-        for item in plan.copies[:10]:
+        for item in islice(plan.copies, PLAN_ITEMS_SHOWN):
             print(f"  {item.src_rel_path} ({item.reason})")
-        if len(plan.copies) > 10:
-            print(f"  ... and {len(plan.copies) - 10} more")
+        if len(plan.copies) > PLAN_ITEMS_SHOWN:
+            print(f"  ... and {len(plan.copies) - PLAN_ITEMS_SHOWN} more")
         print()
 
     if plan.deletes:
         print("Files to DELETE (after verification):")
-        for item in plan.deletes[:10]:
+        for item in islice(plan.deletes, PLAN_ITEMS_SHOWN):
             print(f"  {item.dst_rel_path}")
-        if len(plan.deletes) > 10:
-            print(f"  ... and {len(plan.deletes) - 10} more")
+        if len(plan.deletes) > PLAN_ITEMS_SHOWN:
+            print(f"  ... and {len(plan.deletes) - PLAN_ITEMS_SHOWN} more")
         print()
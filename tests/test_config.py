@@ -0,0 +1,67 @@
+"""
+Saved user settings. Run with: python -m unittest discover tests
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+
+class UserConfigTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # Settings are module globals: put the defaults back after each test
+        for name in config.USER_SETTINGS:
+            patcher = mock.patch.object(config, name, getattr(config, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(config, "USER_CONFIG_PATH", os.path.join(tmp.name, "config.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _load(self, overrides) -> str:
+        with open(config.USER_CONFIG_PATH, "w", encoding="utf-8") as f:
+            json.dump(overrides, f)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            config._load_user_config()
+        return out.getvalue()
+
+    def test_bad_overrides_are_ignored_with_a_warning(self):
+        exclude_dirs, max_size = config.EXCLUDE_DIRS, config.MAX_FILE_SIZE_MB
+        output = self._load({"EXCLUDE_DIRS": "build", "MAX_FILE_SIZE_MB": None,
+                             "EXCLUDE_EXTENSIONS": [".bak", 3]})
+
+        self.assertIs(config.EXCLUDE_DIRS, exclude_dirs)
+        self.assertEqual(config.MAX_FILE_SIZE_MB, max_size)
+        for name in config.USER_SETTINGS:
+            self.assertIn(f"ignoring {name}", output)
+
+    def test_valid_overrides_are_applied(self):
+        output = self._load({"EXCLUDE_DIRS": ["out"], "MAX_FILE_SIZE_MB": 10})
+
+        self.assertEqual(config.EXCLUDE_DIRS, ["out"])
+        self.assertEqual(config.MAX_FILE_SIZE_MB, 10)
+        self.assertEqual(output, "")
+
+    def test_save_round_trips_without_leaving_a_temp_file(self):
+        config.MAX_FILE_SIZE_MB = 42
+        config.save_user_config()
+        config.MAX_FILE_SIZE_MB = 1
+        config._load_user_config()
+
+        self.assertEqual(config.MAX_FILE_SIZE_MB, 42)
+        self.assertFalse(os.path.exists(config.USER_CONFIG_PATH + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
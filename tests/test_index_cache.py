@@ -0,0 +1,33 @@
+"""
+Index cache round trips. Run with: python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_index import FileIndex, load_index_cache, save_index_cache
+
+
+class IndexCacheTest(unittest.TestCase):
+    def test_non_utf8_file_name_round_trips(self):
+        # How os.scandir reports a POSIX file name that isn't valid UTF-8
+        name = os.fsdecode(b"dir/bad\xff.txt") if os.name == "posix" else "dir/bad\udcff.txt"
+        index = FileIndex()
+        index.add_entry(name, "blake2b:00", 1.0, 2, 3, 4)
+        index.add_entry("ok.txt", "blake2b:11", 1.0, 2, 3, 4)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "cache.json")
+            save_index_cache(cache_path, index)
+            self.assertEqual(os.listdir(tmp), ["cache.json"])  # No temp file left behind
+            loaded = load_index_cache(cache_path)
+
+        self.assertIsNotNone(loaded)
+        self.assertEqual(sorted(loaded.path_to_idx), sorted([name, "ok.txt"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
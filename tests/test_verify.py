@@ -0,0 +1,107 @@
+"""
+Mirror verification: --hash-policy never (stat fingerprints instead of content
+digests) and --verify-only without an index cache.
+Run with: python -m unittest discover tests
+"""
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from backup_utils import BackupManager
+from file_index import build_index, get_cache_path, is_current_digest, load_index_cache
+from sync_engine import SyncAction, generate_sync_plan, verify_mirror
+
+
+def _write(path: str, data: bytes, mtime_ns: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class VerifyStatFingerprintTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.src = os.path.join(tmp.name, "src")
+        self.dst = os.path.join(tmp.name, "dst")
+        for rel in ("a.txt", "sub/b.txt"):
+            for root in (self.src, self.dst):
+                _write(os.path.join(root, rel), b"content " + rel.encode(), 1_600_000_000_000_000_000)
+        self.src_index, _ = build_index(self.src, hash_policy="never")
+
+    def test_verify_only_matching_mirror_passes(self):
+        success, mismatches = verify_mirror(self.src_index, self.dst)
+        self.assertTrue(success, mismatches)
+
+    def test_verify_only_with_validation_sampling_passes(self):
+        # Every file forced through the full check, which must not compare a
+        # stat fingerprint against a content hash
+        success, mismatches = verify_mirror(self.src_index, self.dst, trust_mtime=True, validation_freq=1)
+        self.assertTrue(success, mismatches)
+
+    def test_verify_only_reports_modified_file(self):
+        _write(os.path.join(self.dst, "a.txt"), b"CONTENT a.txt", 1_700_000_000_000_000_000)
+        success, mismatches = verify_mirror(self.src_index, self.dst)
+        self.assertFalse(success)
+        self.assertEqual([m["path"] for m in mismatches], ["a.txt"])
+        self.assertTrue(mismatches[0]["reason"].startswith("Modified"))
+
+    def test_mtimes_rounded_by_the_destination_still_match(self):
+        # FAT32 keeps mtimes to 2 seconds: a copy can be up to 2s off its source
+        _write(os.path.join(self.dst, "a.txt"), b"content a.txt", 1_600_000_001_990_000_000)
+        success, mismatches = verify_mirror(self.src_index, self.dst)
+        self.assertTrue(success, mismatches)
+
+        dst_index, _ = build_index(self.dst, hash_policy="never")
+        plan = generate_sync_plan(self.src_index, dst_index, self.src, self.dst)
+        self.assertEqual({item.action for item in plan.items}, {SyncAction.SKIP})
+
+    def test_never_keeps_cached_destination_digests(self):
+        # Each run has something to copy, so it saves the destination cache
+        os.remove(os.path.join(self.dst, "a.txt"))
+        with redirect_stdout(io.StringIO()):
+            BackupManager().backup_directory(self.src, self.dst)
+        _write(os.path.join(self.src, "c.txt"), b"new", 1_600_000_000_000_000_000)
+        with redirect_stdout(io.StringIO()):
+            BackupManager(hash_policy="never").backup_directory(self.src, self.dst)
+
+        # Digests cached by the first run survive; c.txt, never hashed, isn't saved
+        cache = load_index_cache(get_cache_path(self.dst))
+        self.assertEqual(sorted(cache.path_to_idx), ["a.txt", "sub/b.txt"])
+        self.assertTrue(all(is_current_digest(digest) for digest in cache.digests))
+
+    def test_paranoid_with_never_is_rejected(self):
+        argv = ["main.py", "backup", self.src, "-d", self.dst, "--paranoid", "--hash-policy", "never"]
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", argv), \
+                mock.patch("backup_utils.BackupManager") as manager, redirect_stdout(out):
+            main.main()
+        manager.assert_not_called()
+        self.assertIn("--paranoid", out.getvalue())
+
+
+class VerifyOnlyWithoutCacheTest(unittest.TestCase):
+    def test_samples_content_of_size_and_mtime_matches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "src")
+            dst = os.path.join(tmp, "dst")
+            # Same size and mtime, different content: only a re-hash catches it
+            _write(os.path.join(src, "a.txt"), b"original", 1_600_000_000_000_000_000)
+            _write(os.path.join(dst, "a.txt"), b"ORIGINAL", 1_600_000_000_000_000_000)
+            out = io.StringIO()
+            with redirect_stdout(out):
+                BackupManager().backup_directory(src, dst, verify_only=True)
+        self.assertIn("VERIFICATION FAILED", out.getvalue())
+        self.assertIn("a.txt: Digest mismatch", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()